@@ -0,0 +1,295 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+log = logging.getLogger(__name__)
+
+# -------------------- Lazy sounds ---------------------
+class LazySound:
+    """
+    Stand-in for pygame.mixer.Sound that decodes the file on first use
+    (or when the manager preloads it in the background). Volume set
+    before the sound is loaded is applied once it is.
+    """
+    def __init__(self, manager, name, path):
+        self.manager = manager
+        self.name = name
+        self.path = path
+        self.sound = None
+        self.failed = False
+        self._volume = None
+        self._queued = False   # a background load has been requested
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self.sound is None and not self.failed:
+                t0 = time.perf_counter()
+                try:
+                    self.sound = pygame.mixer.Sound(self.path)
+                except (pygame.error, FileNotFoundError) as e:
+                    self.failed = True
+                    self.manager.record(self.name, time.perf_counter() - t0, 0, error=str(e))
+                    return None
+                if self._volume is not None:
+                    self.sound.set_volume(self._volume)
+                self.manager.record(self.name, time.perf_counter() - t0, _pcm_bytes(self.sound))
+            return self.sound
+
+    def get(self):
+        """The decoded Sound, or None if it isn't loaded yet. Never decodes
+        on the calling thread; the first miss queues a background load."""
+        if self.sound is None and not self.failed and not self._queued:
+            self.manager.preload_async([self.name])
+        return self.sound
+
+    def set_volume(self, value):
+        self._volume = value
+        if self.sound is not None:
+            self.sound.set_volume(value)
+
+    def get_volume(self):
+        if self.sound is not None:
+            return self.sound.get_volume()
+        return 1.0 if self._volume is None else self._volume
+
+
+def _pcm_bytes(sound):
+    """Decoded size of a Sound, from its length and the mixer format."""
+    init = pygame.mixer.get_init()
+    if not init:
+        return 0
+    freq, fmt, channels = init
+    return int(sound.get_length() * freq * channels * (abs(fmt) // 8))
+
+
+# -------------------- Streamed music ------------------
+class MusicStream:
+    """
+    Background music through pygame.mixer.music, which streams from disk
+    instead of holding the whole decoded track in RAM. Mimics the bits of
+    Sound/Channel the game uses: play() returns the stream itself, so
+    `APP.music_channel = APP.music.play(loops=-1)` and the channel's
+    stop() / set_volume() work as they would on a mixer Channel.
+    """
+    def __init__(self, manager, name, path):
+        self.manager = manager
+        self.name = name
+        self.path = path
+        self.loaded = False
+        self._volume = 1.0
+
+    def load(self):
+        if not self.loaded:
+            t0 = time.perf_counter()
+            try:
+                pygame.mixer.music.load(self.path)
+            except (pygame.error, FileNotFoundError) as e:
+                self.manager.record(self.name, time.perf_counter() - t0, 0, error=str(e))
+                return False
+            self.loaded = True
+            self.manager.record(self.name, time.perf_counter() - t0, 0, streamed=True)
+        return True
+
+    def play(self, loops=0):
+        if not self.load():
+            return None
+        pygame.mixer.music.set_volume(self._volume)
+        pygame.mixer.music.play(loops)
+        return self
+
+    def stop(self):
+        if self.loaded:
+            pygame.mixer.music.stop()
+
+    def set_volume(self, value):
+        self._volume = value
+        if self.loaded:
+            pygame.mixer.music.set_volume(value)
+
+    def get_busy(self):
+        return self.loaded and pygame.mixer.music.get_busy()
+
+
+# -------------------- SFX dispatch --------------------
+class Sfx:
+    """A sound effect routed through an SfxDispatcher; play() like a Sound."""
+    def __init__(self, dispatcher, sound, priority=0, min_interval_ms=0):
+        self.dispatcher = dispatcher
+        self.sound = sound
+        self.priority = priority
+        self.min_interval_ms = min_interval_ms
+        self.last_play = None   # get_ticks() of the last real play
+        self.channel = None
+
+    def play(self):
+        return self.dispatcher.trigger(self)
+
+    def set_volume(self, value):
+        self.sound.set_volume(value)
+
+    def get_volume(self):
+        return self.sound.get_volume()
+
+
+class SfxDispatcher:
+    """
+    Plays sound effects on a fixed pool of `voices` mixer channels, so a
+    burst of triggers can't flood the mixer. Per trigger, in order:
+    - merged: the same sound already started within merge_ms (the same
+      frame); the trigger folds into that voice
+    - rate limited: the sound played less than its min_interval_ms ago
+    - otherwise it takes a free pool channel, or steals the oldest voice
+      of lower-or-equal priority; if every voice outranks it, dropped
+    A trigger is also dropped while the sound is still loading in the
+    background (it is never decoded on the game thread) or when there
+    is no mixer.
+    The pool channels are reserved, so Sound.play() elsewhere can't take
+    them; music streams through mixer.music, outside the pool entirely.
+    """
+    def __init__(self, voices=8, merge_ms=16):
+        self.voices = voices
+        self.merge_ms = merge_ms
+        self.triggers = 0
+        self.played = 0
+        self.merged = 0
+        self.rate_limited = 0
+        self.dropped = 0
+        self.stolen = 0
+        self._channels = None
+        self._slots = []   # per channel: [priority, start ticks]
+
+    def add(self, sound, priority=0, min_interval_ms=0):
+        return Sfx(self, sound, priority, min_interval_ms)
+
+    def _pool(self):
+        if self._channels is None and pygame.mixer.get_init():
+            pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), self.voices))
+            pygame.mixer.set_reserved(self.voices)
+            self._channels = [pygame.mixer.Channel(i) for i in range(self.voices)]
+            self._slots = [[0, 0] for _ in range(self.voices)]
+        return self._channels
+
+    def _voice(self, priority):
+        channels = self._pool()
+        if not channels:
+            return None
+        for i, ch in enumerate(channels):
+            if not ch.get_busy():
+                return i
+        # All busy: steal the lowest-priority, then oldest, voice
+        i = min(range(len(channels)), key=lambda k: self._slots[k])
+        if self._slots[i][0] > priority:
+            return None
+        self.stolen += 1
+        return i
+
+    def trigger(self, sfx):
+        self.triggers += 1
+        now = pygame.time.get_ticks()
+        if sfx.last_play is not None:
+            since = now - sfx.last_play
+            if since < self.merge_ms:
+                self.merged += 1
+                return sfx.channel
+            if since < sfx.min_interval_ms:
+                self.rate_limited += 1
+                return None
+
+        sound = sfx.sound.get()
+        if sound is None:
+            self.dropped += 1
+            return None
+        i = self._voice(sfx.priority)
+        if i is None:
+            self.dropped += 1
+            return None
+        ch = self._channels[i]
+        ch.play(sound)
+        self._slots[i] = [sfx.priority, now]
+        sfx.last_play = now
+        sfx.channel = ch
+        self.played += 1
+        return ch
+
+    def stats(self):
+        return {
+            "triggers": self.triggers,
+            "played": self.played,
+            "merged": self.merged,
+            "rate_limited": self.rate_limited,
+            "dropped": self.dropped,
+            "stolen": self.stolen,
+        }
+
+
+# -------------------- Manager -------------------------
+class AssetManager:
+    """
+    Registry of game assets. Nothing is decoded at registration;
+    assets load on first use or via preload_async() on a background
+    thread. Load time and decoded size are kept per asset in `stats`.
+    """
+    def __init__(self):
+        self.assets = {}
+        self.stats = {}
+        self._pool = None
+        self._stats_lock = threading.Lock()
+
+    def sound(self, name, path):
+        asset = LazySound(self, name, path)
+        self.assets[name] = asset
+        return asset
+
+    def music(self, name, path):
+        asset = MusicStream(self, name, path)
+        self.assets[name] = asset
+        return asset
+
+    def preload_async(self, names=None):
+        """Decode sounds in the background so first plays don't stall.
+        (Music is not preloaded; mixer.music only streams on the main thread.)"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="assets")
+        targets = [self.assets[n] for n in (names if names is not None else list(self.assets))]
+        sounds = [a for a in targets if isinstance(a, LazySound)]
+        for sound in sounds:
+            sound._queued = True
+        futures = [self._pool.submit(sound.load) for sound in sounds]
+        if names is None:
+            # Single worker: this runs once every sound above has loaded
+            self._pool.submit(self._log_report)
+        return futures
+
+    def _log_report(self):
+        for line in self.report():
+            log.info("asset %s", line)
+
+    def record(self, name, seconds, nbytes, streamed=False, error=None):
+        path = self.assets[name].path
+        entry = {
+            "seconds": seconds,
+            "decoded_bytes": nbytes,
+            "file_bytes": os.path.getsize(path) if os.path.exists(path) else 0,
+            "streamed": streamed,
+        }
+        if error:
+            entry["error"] = error
+        with self._stats_lock:
+            self.stats[name] = entry
+
+    def report(self):
+        """One line per loaded asset: load time and memory."""
+        with self._stats_lock:
+            items = sorted(self.stats.items())
+        lines = []
+        for name, st in items:
+            mem = "streamed" if st["streamed"] else f"{st['decoded_bytes'] / 1024:.0f} KiB decoded"
+            err = f"  ERROR: {st['error']}" if "error" in st else ""
+            lines.append(f"{name:<12} {st['seconds'] * 1000:7.1f} ms  {mem}  "
+                         f"(file {st['file_bytes'] / 1024:.0f} KiB){err}")
+        return lines
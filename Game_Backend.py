@@ -1,8 +1,792 @@
+import importlib.util
+import math
+import random
+
+# -------------------- Arena ---------------------------
+ARENA_WIDTH, ARENA_HEIGHT = 1000, 800
+TICK_RATE = 60               # simulation ticks per second
+DT = 1.0 / TICK_RATE         # seconds per tick
+
+# Input bits for Match.step (one bit per arrow key)
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_UP = 4
+INPUT_DOWN = 8
+
+# Circle speed multiplier per difficulty setting
+DIFFICULTY_SPEED = {"Easy": 0.75, "Normal": 1.0, "Hard": 1.25}
+
+
 class Player:
+    __slots__ = ("x", "y", "radius", "move_speed", "color")
+
     def __init__(self, x, y, radius, speed, color):
         self.x = x
         self.y = y
         self.radius = radius
         self.move_speed = speed
         self.color = color
-        
\ No newline at end of file
+
+
+# -------------------- Spatial Hash ----------------------
+class SpatialHash:
+    """
+    Uniform grid used as a collision broad phase.
+    Cell size should be at least the largest possible contact distance
+    (2 × max radius) so every touching pair sits in neighbouring cells.
+    """
+    def __init__(self, cell_size):
+        self.cell_size = max(1, int(cell_size))
+        self.cells = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    def cell_of(self, x, y):
+        cs = self.cell_size
+        return int(x // cs), int(y // cs)
+
+    def insert(self, index, x, y):
+        key = self.cell_of(x, y)
+        bucket = self.cells.get(key)
+        if bucket is None:
+            self.cells[key] = [index]
+        else:
+            bucket.append(index)
+
+    def rebuild(self, items):
+        """Rebuild from objects with x/y; stores list indices."""
+        self.cells.clear()
+        for idx, it in enumerate(items):
+            self.insert(idx, it.x, it.y)
+
+    def nearby(self, x, y, reach=1):
+        """Yield indices stored in the block of cells around (x, y).
+        reach=1 scans the usual 3×3 neighbourhood."""
+        cx, cy = self.cell_of(x, y)
+        cells = self.cells
+        for gx in range(cx - reach, cx + reach + 1):
+            for gy in range(cy - reach, cy + reach + 1):
+                bucket = cells.get((gx, gy))
+                if bucket:
+                    yield from bucket
+
+
+# -------------------- Spawn Placement -------------------
+class PlacementError(RuntimeError):
+    """Raised when a circle cannot be placed within the attempt budget."""
+
+
+class CirclePlacer:
+    """
+    Places non-overlapping circles inside [margin, size - margin] using a
+    grid index, so each attempt only looks at nearby circles.
+
+    A few uniform random tries are made first (cheap while the arena is
+    sparse); after that, Bridson-style sampling tries the annulus around
+    "active" placed circles. A circle whose annulus keeps failing is
+    retired, so total work stays bounded and a full arena ends in
+    PlacementError instead of an endless loop.
+    """
+    def __init__(self, width, height, margin=50, max_radius=30,
+                 uniform_attempts=30, annulus_attempts=20, rng=None):
+        self.width = width
+        self.height = height
+        self.margin = margin
+        self.uniform_attempts = uniform_attempts
+        self.annulus_attempts = annulus_attempts
+        self.rng = rng if rng is not None else random
+        self.max_r = max_radius
+        self.grid = SpatialHash(2 * max_radius)
+        self.placed = []   # (x, y, r)
+        self.active = []   # indices into placed
+
+    def add_blocker(self, x, y, r):
+        """Reserve space (e.g. for the player or an existing circle)."""
+        idx = len(self.placed)
+        self.placed.append((x, y, r))
+        self.grid.insert(idx, x, y)
+        self.active.append(idx)
+        if r > self.max_r:
+            self.max_r = r
+
+    def fits(self, x, y, r):
+        m = self.margin
+        if x < m or x > self.width - m or y < m or y > self.height - m:
+            return False
+        reach = int((r + self.max_r) // self.grid.cell_size) + 1
+        placed = self.placed
+        for idx in self.grid.nearby(x, y, reach):
+            ox, oy, orad = placed[idx]
+            dx = x - ox
+            dy = y - oy
+            rs = r + orad
+            if dx * dx + dy * dy <= rs * rs:
+                return False
+        return True
+
+    def place(self, r):
+        """Return an (x, y) for a circle of radius r and reserve it."""
+        rng = self.rng
+        m = self.margin
+        for _ in range(self.uniform_attempts):
+            x = rng.randint(m, self.width - m)
+            y = rng.randint(m, self.height - m)
+            if self.fits(x, y, r):
+                self.add_blocker(x, y, r)
+                return x, y
+
+        while self.active:
+            slot = rng.randrange(len(self.active))
+            ax, ay, ar = self.placed[self.active[slot]]
+            inner = ar + r
+            for _ in range(self.annulus_attempts):
+                ang = rng.random() * math.tau
+                dist = inner + 1 + rng.random() * self.max_r
+                x = int(round(ax + math.cos(ang) * dist))
+                y = int(round(ay + math.sin(ang) * dist))
+                if self.fits(x, y, r):
+                    self.add_blocker(x, y, r)
+                    return x, y
+            # Swap-remove the exhausted circle from the active list
+            self.active[slot] = self.active[-1]
+            self.active.pop()
+
+        raise PlacementError(
+            f"no room for a circle of radius {r} after {len(self.placed)} placements"
+        )
+
+
+# -------------------- Circles -------------------------
+class Circle:
+    # Slotted: no per-instance dict, and a typo'd attribute raises
+    __slots__ = ("r", "color", "x", "y", "px", "py", "vx", "vy")
+
+    def __init__(self, circles, player, placer=None, rng=None,
+                 width=ARENA_WIDTH, height=ARENA_HEIGHT):
+        rng = rng if rng is not None else random
+        self.r = rng.randint(10, 30)
+        self.color = (
+            rng.randint(0, 255),
+            rng.randint(0, 255),
+            rng.randint(0, 255),
+        )
+        # Find a spot that doesn't overlap circles or player.
+        # Pass a shared placer when spawning many circles; building one
+        # here costs O(len(circles)) per circle.
+        if placer is None:
+            placer = make_placer(circles, player, width, height, rng)
+        self.x, self.y = placer.place(self.r)
+        self.px, self.py = self.x, self.y   # position before the last tick
+        self.vx = self.vy = 0               # set by the Match that owns it
+
+    def draw(self, surf):
+        import pygame  # only drawing needs pygame; the simulation runs without it
+        pygame.draw.circle(surf, self.color, (self.x, self.y), self.r)
+
+    def check_collision(self, other):
+        dx = self.x - other.x
+        dy = self.y - other.y
+        dist_sq = dx * dx + dy * dy
+        rs = self.r + other.r
+        return dist_sq < rs * rs
+
+    def check_collision_player(self, player):
+        dx = self.x - player.x
+        dy = self.y - player.y
+        dist_sq = dx * dx + dy * dy
+        rs = self.r + player.radius
+        return dist_sq <= rs * rs
+
+
+def make_placer(circles, player, width=ARENA_WIDTH, height=ARENA_HEIGHT, rng=None):
+    """Placement index seeded with the player and any existing circles."""
+    placer = CirclePlacer(width, height, margin=50, max_radius=30, rng=rng)
+    placer.add_blocker(player.x, player.y, player.radius)
+    for c in circles:
+        placer.add_blocker(c.x, c.y, c.r)
+    return placer
+
+
+def spawn_circles(count, player, width=ARENA_WIDTH, height=ARENA_HEIGHT, rng=None):
+    """
+    Spawn `count` non-overlapping circles.
+    Raises PlacementError if the arena cannot fit them.
+    """
+    placer = make_placer([], player, width, height, rng)
+    return [Circle([], player, placer, rng, width, height) for _ in range(count)]
+
+
+# -------------------- Array Engine (optional NumPy) -----
+# NumPy is optional and only imported once an engine is built, so that
+# importing this module stays cheap. Without it the pure-Python loop runs.
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+np = None
+
+
+def _load_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+class CircleArrays:
+    """
+    Structure-of-arrays circle simulation backed by NumPy.
+    Positions, radii, velocities and colors live in flat arrays and every
+    step is a handful of batched operations instead of a Python loop.
+
+    Circle-circle bounces are resolved simultaneously: a circle flips its
+    velocity once per overlapping neighbour (so two hits cancel out), which
+    is the same parity rule as the pure-Python loop without its
+    list-order dependence.
+    """
+    def __init__(self, xs, ys, rs, vxs, vys, colors, width, height):
+        if not HAS_NUMPY:
+            raise RuntimeError("CircleArrays requires NumPy")
+        _load_numpy()
+        self.x = np.asarray(xs, dtype=np.float64)
+        self.y = np.asarray(ys, dtype=np.float64)
+        self.r = np.asarray(rs, dtype=np.float64)
+        self.vx = np.asarray(vxs, dtype=np.float64)
+        self.vy = np.asarray(vys, dtype=np.float64)
+        self.color = np.asarray(colors, dtype=np.uint8).reshape(-1, 3)
+        self.px = self.x.copy()   # positions before the last tick
+        self.py = self.y.copy()
+        self.width = width
+        self.height = height
+
+    @classmethod
+    def from_circles(cls, circles, width, height):
+        return cls(
+            [c.x for c in circles], [c.y for c in circles], [c.r for c in circles],
+            [c.vx for c in circles], [c.vy for c in circles],
+            [c.color for c in circles], width, height,
+        )
+
+    def __len__(self):
+        return len(self.x)
+
+    def items(self, alpha=1.0):
+        """Yield (x, y, r, color) tuples for drawing, blended `alpha` of the
+        way from the previous tick to the current one."""
+        colors = [tuple(c) for c in self.color.tolist()]
+        if alpha >= 1.0:
+            xs, ys = self.x, self.y
+        else:
+            xs = self.px + (self.x - self.px) * alpha
+            ys = self.py + (self.y - self.py) * alpha
+        return zip(xs.tolist(), ys.tolist(), self.r.tolist(), colors)
+
+    def step(self, player, phase_hook=None):
+        """Advance one tick; returns how many circles the player ate."""
+        if len(self.x) == 0:
+            return 0
+        self._integrate()
+        self._bounce_walls()
+        if phase_hook is not None:
+            phase_hook("physics")
+        self._bounce_pairs()
+        eaten = self._eat(player)
+        if phase_hook is not None:
+            phase_hook("collision")
+        return eaten
+
+    def _integrate(self):
+        self.px[...] = self.x
+        self.py[...] = self.y
+        self.x += self.vx
+        self.y += self.vy
+
+    def _bounce_walls(self):
+        x, y, r = self.x, self.y, self.r
+        lo = x - r <= 0
+        hi = ~lo & (x + r >= self.width)
+        x[lo] = r[lo]
+        x[hi] = self.width - r[hi]
+        self.vx[lo | hi] *= -1
+
+        lo = y - r <= 0
+        hi = ~lo & (y + r >= self.height)
+        y[lo] = r[lo]
+        y[hi] = self.height - r[hi]
+        self.vy[lo | hi] *= -1
+
+    def _pairs(self):
+        """Return (i, j) index arrays of overlapping pairs with i < j."""
+        n = len(self.x)
+        cs = max(1.0, 2.0 * float(self.r.max()))
+        gw = int(self.width // cs) + 3   # +1 pad on each side
+        gh = int(self.height // cs) + 3
+        cx = np.clip((self.x // cs).astype(np.int64) + 1, 1, gw - 2)
+        cy = np.clip((self.y // cs).astype(np.int64) + 1, 1, gh - 2)
+        cell = cx * gh + cy
+
+        # Fixed-capacity cell table: table[cell, k] = circle index or -1
+        counts = np.bincount(cell, minlength=gw * gh)
+        order = np.argsort(cell, kind="stable")
+        sorted_cell = cell[order]
+        starts = np.cumsum(counts) - counts
+        slot = np.arange(n) - starts[sorted_cell]
+        table = np.full((gw * gh, int(counts.max())), -1, dtype=np.int64)
+        table[sorted_cell, slot] = order
+
+        idx = np.arange(n)
+        pi, pj = [], []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                cand = table[cell + dx * gh + dy]          # (n, K)
+                ii, kk = np.nonzero(cand > idx[:, None])   # each pair once
+                jj = cand[ii, kk]
+                ddx = self.x[ii] - self.x[jj]
+                ddy = self.y[ii] - self.y[jj]
+                rs = self.r[ii] + self.r[jj]
+                hit = ddx * ddx + ddy * ddy < rs * rs
+                pi.append(ii[hit])
+                pj.append(jj[hit])
+        return np.concatenate(pi), np.concatenate(pj)
+
+    def _bounce_pairs(self):
+        pi, pj = self._pairs()
+        if len(pi) == 0:
+            return
+        hits = np.bincount(np.concatenate((pi, pj)), minlength=len(self.x))
+        flip = (hits & 1).astype(bool)
+        self.vx[flip] *= -1
+        self.vy[flip] *= -1
+
+    def _eat(self, player):
+        dx = self.x - player.x
+        dy = self.y - player.y
+        rs = self.r + player.radius
+        eaten = dx * dx + dy * dy <= rs * rs
+        count = int(eaten.sum())
+        if count:
+            keep = ~eaten
+            self.x = self.x[keep]
+            self.y = self.y[keep]
+            self.r = self.r[keep]
+            self.vx = self.vx[keep]
+            self.vy = self.vy[keep]
+            self.color = self.color[keep]
+            self.px = self.px[keep]
+            self.py = self.py[keep]
+        return count
+
+
+# -------------------- Match (headless core) -------------
+# Circle counts at or above this use CircleArrays (needs NumPy);
+# smaller arenas and installs without NumPy keep the pure-Python loop.
+# NumPy is what keeps big arenas at 60 FPS: at 5000 circles a tick is
+# about 4 ms with CircleArrays and about 30 ms in the pure-Python loop.
+ARRAY_ENGINE_MIN_CIRCLES = 500
+# Below this the pure-Python loop skips the SpatialHash broad phase.
+BROAD_PHASE_MIN_CIRCLES = 32
+
+
+class Match:
+    """
+    All simulation state of one round: player, circles (with their velocities),
+    points and elapsed time. Advanced by step() in fixed DT ticks and
+    never touches the display, so it runs headless and as fast as the
+    CPU allows.
+    """
+    def __init__(self, num_circles=None, speed_mult=1.0, rng=None,
+                 width=ARENA_WIDTH, height=ARENA_HEIGHT, array_engine=None,
+                 seed=None, record=False):
+        # Each match draws from its own RNG so a seed reproduces it exactly
+        if rng is None:
+            if seed is None:
+                seed = random.getrandbits(32)
+            rng = random.Random(seed)
+        self.seed = seed
+        self.rng = rng
+        self.width = width
+        self.height = height
+
+        # Inputs are recorded per tick when asked (needs a seed, not an rng)
+        self.replay = None
+        if record:
+            if seed is None:
+                raise ValueError("recording a replay needs a seeded match")
+            self.replay = Replay(seed, speed_mult, num_circles, width, height)
+
+        # Player
+        self.player = Player(100, 100, 25, 10, (255, 0, 0))
+
+        # Circles
+        if num_circles is None:
+            num_circles = self.rng.randint(5, 20)
+        self.circles = spawn_circles(num_circles, self.player, width, height, self.rng)
+
+        # Velocities (respect difficulty); drawn after spawning, as before
+        base_speeds = [-5, 5]
+        for c in self.circles:
+            c.vx = self.rng.choice(base_speeds) * speed_mult
+            c.vy = self.rng.choice(base_speeds) * speed_mult
+
+        # Collision broad phase (cell size is refreshed every tick)
+        self.grid = SpatialHash(60)
+
+        # Large arenas switch to the batched NumPy engine when it is available
+        if array_engine is None:
+            array_engine = HAS_NUMPY and num_circles >= ARRAY_ENGINE_MIN_CIRCLES
+        self.engine = None
+        if array_engine:
+            self.engine = CircleArrays.from_circles(self.circles, width, height)
+            self.circles = []
+        if self.replay is not None:
+            # The engines bounce pairs slightly differently; replay on the same one
+            self.replay.array_engine = bool(array_engine)
+
+        self.points = 0
+        self.ticks = 0
+        self.won = False
+        self.prev_player = (self.player.x, self.player.y)
+
+        # Optional callable(phase) invoked after the "physics" and
+        # "collision" parts of each step (see Game_Perf.PerfMonitor.mark)
+        self.phase_hook = None
+
+    @property
+    def elapsed(self):
+        """Simulated seconds since the round started."""
+        return self.ticks * DT
+
+    @property
+    def remaining(self):
+        if self.engine is not None:
+            return len(self.engine)
+        return len(self.circles)
+
+    def circle_items(self, alpha=1.0):
+        """Yield (x, y, r, color) for every live circle.
+        alpha < 1 interpolates between the previous and current tick."""
+        if self.engine is not None:
+            return self.engine.items(alpha)
+        if alpha >= 1.0:
+            return ((c.x, c.y, c.r, c.color) for c in self.circles)
+        return ((c.px + (c.x - c.px) * alpha, c.py + (c.y - c.py) * alpha, c.r, c.color)
+                for c in self.circles)
+
+    def player_pos(self, alpha=1.0):
+        px, py = self.prev_player
+        x, y = self.player.x, self.player.y
+        if alpha >= 1.0:
+            return x, y
+        return px + (x - px) * alpha, py + (y - py) * alpha
+
+    def step(self, inputs=0):
+        """Advance one tick with the given INPUT_* bits; returns circles eaten."""
+        if self.won:
+            return 0
+        if self.replay is not None:
+            self.replay.record(inputs)
+        hook = self.phase_hook
+        self._move_player(inputs)
+        if self.engine is not None:
+            eaten = self.engine.step(self.player, hook)
+        else:
+            # The list engine moves and collides each circle in one pass;
+            # that whole pass is reported as collision
+            if hook is not None:
+                hook("physics")
+            eaten = self._step_circles((self.player,))[0]
+            if hook is not None:
+                hook("collision")
+        self.points += eaten
+        self.ticks += 1
+        if self.remaining == 0:
+            self.won = True
+        return eaten
+
+    def _move_player(self, inputs, player=None):
+        if player is None:
+            player = self.player
+            self.prev_player = (player.x, player.y)
+        if inputs & INPUT_LEFT:
+            player.x -= player.move_speed
+        if inputs & INPUT_RIGHT:
+            player.x += player.move_speed
+        if inputs & INPUT_UP:
+            player.y -= player.move_speed
+        if inputs & INPUT_DOWN:
+            player.y += player.move_speed
+
+        # Keep in bounds
+        player.x = max(player.radius, min(player.x, self.width - player.radius))
+        player.y = max(player.radius, min(player.y, self.height - player.radius))
+
+    def _step_circles(self, players):
+        """Move, bounce and eat for one tick; returns circles eaten per player
+        (a circle touching several players goes to the first of them)."""
+        circles = self.circles
+        width, height = self.width, self.height
+
+        # Broad phase: bucket circles by their pre-move position.
+        # Only circles later in the list are tested, and those haven't moved
+        # yet this tick, so the grid stays exact for every query below.
+        # Tiny arenas skip it; a plain pairwise scan is cheaper there.
+        n = len(circles)
+        grid = None
+        if n >= BROAD_PHASE_MIN_CIRCLES:
+            grid = self.grid
+            max_r = max(c.r for c in circles)
+            grid.cell_size = max(1, 2 * max_r)
+            grid.rebuild(circles)
+
+        # Move circles + bounce + destroy.
+        # Survivors are compacted in the same pass (O(n) per tick, no
+        # pop(i)); list order is kept because it decides pair order and
+        # so must match recorded replays.
+        eaten = [0] * len(players)
+        solo = players[0] if len(players) == 1 else None
+        alive = []
+        for i in range(n):
+            c = circles[i]
+            c.px, c.py = c.x, c.y
+            c.x += c.vx
+            c.y += c.vy
+
+            # Wall bounce
+            if c.x - c.r <= 0:
+                c.x = c.r
+                c.vx = -c.vx
+            elif c.x + c.r >= width:
+                c.x = width - c.r
+                c.vx = -c.vx
+
+            if c.y - c.r <= 0:
+                c.y = c.r
+                c.vy = -c.vy
+            elif c.y + c.r >= height:
+                c.y = height - c.r
+                c.vy = -c.vy
+
+            # Circle-circle bounce (simple)
+            others = grid.nearby(c.x, c.y) if grid is not None else range(i + 1, n)
+            for j in others:
+                if j > i:
+                    o = circles[j]
+                    if c.check_collision(o):
+                        c.vx, c.vy = -c.vx, -c.vy
+                        o.vx, o.vy = -o.vx, -o.vy
+
+            # destroy on player collision
+            if solo is not None:
+                if c.check_collision_player(solo):
+                    eaten[0] += 1
+                    continue
+            else:
+                hit = False
+                for k, p in enumerate(players):
+                    if c.check_collision_player(p):
+                        eaten[k] += 1
+                        hit = True
+                        break
+                if hit:
+                    continue
+
+            alive.append(c)
+
+        circles[:] = alive
+        return eaten
+
+
+# -------------------- Fixed-step clock ----------------
+class FixedStepClock:
+    """
+    Accumulator that turns variable frame times into whole DT ticks.
+    Simulation speed (and recorded times) no longer depend on render FPS.
+    A frame longer than max_frame is clamped so a stall can't trigger an
+    ever-growing catch-up ("spiral of death"); the game slows down instead.
+    """
+    def __init__(self, dt=DT, max_frame=0.25):
+        self.dt = dt
+        self.max_frame = max_frame
+        self.accumulator = 0.0
+
+    def advance(self, frame_seconds):
+        """Add a frame's real time; returns how many ticks to simulate."""
+        self.accumulator += min(max(0.0, frame_seconds), self.max_frame)
+        steps = int(self.accumulator // self.dt)
+        self.accumulator -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self):
+        """Fraction of the next tick already elapsed (for interpolation)."""
+        return self.accumulator / self.dt
+
+
+# -------------------- Replays -------------------------
+class Replay:
+    """
+    Everything needed to reproduce a match: its seed and parameters plus
+    the INPUT_* bits of every tick, run-length encoded as [bits, count]
+    pairs. Playing it back through a fresh Match gives the same result.
+    """
+    VERSION = 1
+
+    def __init__(self, seed, speed_mult=1.0, num_circles=None,
+                 width=ARENA_WIDTH, height=ARENA_HEIGHT, runs=None, array_engine=False):
+        self.seed = seed
+        self.speed_mult = speed_mult
+        self.num_circles = num_circles
+        self.width = width
+        self.height = height
+        self.array_engine = array_engine
+        self.runs = runs if runs is not None else []
+        self.ticks = sum(n for _, n in self.runs)
+
+    def record(self, inputs):
+        runs = self.runs
+        if runs and runs[-1][0] == inputs:
+            runs[-1][1] += 1
+        else:
+            runs.append([inputs, 1])
+        self.ticks += 1
+
+    def inputs(self):
+        """Yield the input bits tick by tick."""
+        for bits, n in self.runs:
+            for _ in range(n):
+                yield bits
+
+    def play(self):
+        """Run the recorded inputs through a new headless Match."""
+        if self.array_engine and not HAS_NUMPY:
+            raise RuntimeError("this replay was recorded with the NumPy engine")
+        m = Match(self.num_circles, self.speed_mult, width=self.width, height=self.height,
+                  array_engine=self.array_engine, seed=self.seed)
+        step = m.step
+        for bits, n in self.runs:
+            for _ in range(n):
+                step(bits)
+        return m
+
+    def verify(self, claimed_time=None, tolerance=1e-6):
+        """True if the replay wins on its last tick (in claimed_time s)."""
+        m = self.play()
+        if not m.won or m.ticks != self.ticks:
+            return False
+        return claimed_time is None or abs(m.elapsed - claimed_time) <= tolerance
+
+    def to_dict(self):
+        return {
+            "version": self.VERSION,
+            "seed": self.seed,
+            "speed_mult": self.speed_mult,
+            "num_circles": self.num_circles,
+            "width": self.width,
+            "height": self.height,
+            "array_engine": self.array_engine,
+            "ticks": self.ticks,
+            "inputs": [v for run in self.runs for v in run],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != cls.VERSION:
+            raise ValueError(f"unsupported replay version: {data.get('version')!r}")
+        flat = data["inputs"]
+        runs = [[flat[i], flat[i + 1]] for i in range(0, len(flat), 2)]
+        return cls(data["seed"], data.get("speed_mult", 1.0), data.get("num_circles"),
+                   data.get("width", ARENA_WIDTH), data.get("height", ARENA_HEIGHT), runs,
+                   data.get("array_engine", False))
+
+
+# -------------------- Headless runs -------------------
+def greedy_policy(match):
+    """Bot input: steer straight at the nearest circle."""
+    if match.remaining == 0:
+        return 0
+    px, py = match.player.x, match.player.y
+    if match.engine is not None:
+        e = match.engine
+        k = int(((e.x - px) ** 2 + (e.y - py) ** 2).argmin())
+        tx, ty = float(e.x[k]), float(e.y[k])
+    else:
+        target = min(match.circles, key=lambda c: (c.x - px) ** 2 + (c.y - py) ** 2)
+        tx, ty = target.x, target.y
+
+    step = match.player.move_speed / 2
+    inputs = 0
+    if tx < px - step:
+        inputs |= INPUT_LEFT
+    elif tx > px + step:
+        inputs |= INPUT_RIGHT
+    if ty < py - step:
+        inputs |= INPUT_UP
+    elif ty > py + step:
+        inputs |= INPUT_DOWN
+    return inputs
+
+
+def sweep_policy(match):
+    """Scripted input: mow the arena in horizontal lanes, down then up,
+    ignoring the circles. Depends only on the tick count and arena size."""
+    p = match.player
+    speed = p.move_speed
+    across = max(1, int((match.width - 2 * p.radius) / speed) + 1)
+    down = max(1, int(2 * p.radius / speed))
+    lanes = max(1, int((match.height - 2 * p.radius) / (2 * p.radius)) + 1)
+    lane, phase = divmod(match.ticks, across + down)
+    if phase < across:
+        return INPUT_RIGHT if lane % 2 == 0 else INPUT_LEFT
+    return INPUT_DOWN if (lane // lanes) % 2 == 0 else INPUT_UP
+
+
+def play_headless(match, policy=greedy_policy, max_ticks=TICK_RATE * 300):
+    """Run a match to completion (or max_ticks) with no display."""
+    while not match.won and match.ticks < max_ticks:
+        match.step(policy(match))
+    return match
+
+
+def run_headless(count, policy=greedy_policy, max_ticks=TICK_RATE * 300, **match_kwargs):
+    """Yield (won, elapsed, points) for `count` fresh matches."""
+    for _ in range(count):
+        m = play_headless(Match(**match_kwargs), policy, max_ticks)
+        yield m.won, m.elapsed, m.points
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import time
+
+    ap = argparse.ArgumentParser(description="Run Circle Eater matches without a display.")
+    ap.add_argument("--matches", type=int, default=1000)
+    ap.add_argument("--circles", type=int, default=None, help="circles per match (default: 5-20)")
+    ap.add_argument("--speed", type=float, default=1.0, help="difficulty speed multiplier")
+    ap.add_argument("--verify", nargs="+", metavar="REPLAY", help="re-simulate saved replay files")
+    args = ap.parse_args()
+
+    if args.verify:
+        # Exit status is the number of replays that failed (capped), so
+        # scripts and CI can check it
+        failed = 0
+        for path in args.verify:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                t0 = time.perf_counter()
+                ok = Replay.from_dict(data).verify(data.get("time"))
+                ms = (time.perf_counter() - t0) * 1000
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                failed += 1
+                print(f"FAIL {path}: unreadable replay ({e})")
+                continue
+            failed += not ok
+            print(f"{'OK  ' if ok else 'FAIL'} {path}: {data['ticks'] * DT:.2f} s of play in {ms:.1f} ms")
+        raise SystemExit(min(failed, 125))
+
+    t0 = time.perf_counter()
+    results = list(run_headless(args.matches, num_circles=args.circles, speed_mult=args.speed))
+    wall = time.perf_counter() - t0
+    wins = [t for won, t, _ in results if won]
+    print(f"{len(results)} matches in {wall:.2f} s ({len(results) / wall:.0f}/s), "
+          f"{len(wins)} won, mean time {sum(wins) / max(1, len(wins)):.2f} s")
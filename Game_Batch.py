@@ -0,0 +1,194 @@
+"""
+Batch match simulator for difficulty balancing.
+
+Plays seeded headless matches with a bot policy on every core and
+reports completion-time distributions per (difficulty, circle count):
+
+    python Game_Batch.py --matches 10000 --circles 5 10 20
+    python Game_Batch.py --matches 1000000 --policy sweep --out runs.csv.gz
+
+Every match is written to --out as one CSV row as soon as its chunk
+finishes; the summary keeps only a tick histogram per group, so memory
+stays flat however many matches run. Match i of a group uses seed
+--seed + i, so any row can be replayed with Game_Backend.Match(seed=...).
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import Game_Backend as gb
+
+POLICIES = {
+    "greedy": gb.greedy_policy,
+    "sweep": gb.sweep_policy,
+}
+
+CSV_FIELDS = ["difficulty", "speed_mult", "circles", "policy", "seed", "won", "ticks", "points"]
+
+
+# -------------------- Worker --------------------------
+def run_chunk(difficulty, circles, policy, first_seed, count, max_ticks):
+    """Play `count` matches in a worker process; returns compact rows."""
+    speed = gb.DIFFICULTY_SPEED[difficulty]
+    play = POLICIES[policy]
+    rows = []
+    for seed in range(first_seed, first_seed + count):
+        m = gb.play_headless(gb.Match(circles, speed, seed=seed), play, max_ticks)
+        rows.append((seed, m.won, m.ticks, m.points))
+    return difficulty, circles, rows
+
+
+# -------------------- Aggregation ---------------------
+class GroupStats:
+    """Completion-time distribution of one (difficulty, circles) group,
+    kept as a histogram of winning tick counts (exact, bounded size)."""
+    def __init__(self):
+        self.matches = 0
+        self.wins = 0
+        self.ticks = Counter()
+
+    def add(self, won, ticks):
+        self.matches += 1
+        if won:
+            self.wins += 1
+            self.ticks[ticks] += 1
+
+    def percentile(self, q):
+        if not self.wins:
+            return None
+        target = q * (self.wins - 1)
+        seen = 0
+        for t in sorted(self.ticks):
+            seen += self.ticks[t]
+            if seen > target:
+                return t * gb.DT
+        return max(self.ticks) * gb.DT
+
+    def summary(self):
+        total = sum(t * n for t, n in self.ticks.items())
+        return {
+            "matches": self.matches,
+            "wins": self.wins,
+            "win_rate": self.wins / self.matches if self.matches else 0.0,
+            "mean_s": total * gb.DT / self.wins if self.wins else None,
+            "min_s": min(self.ticks) * gb.DT if self.wins else None,
+            "p50_s": self.percentile(0.50),
+            "p90_s": self.percentile(0.90),
+            "p99_s": self.percentile(0.99),
+            "max_s": max(self.ticks) * gb.DT if self.wins else None,
+        }
+
+
+def open_output(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", newline="", encoding="utf-8")
+    return open(path, "w", newline="", encoding="utf-8")
+
+
+# -------------------- Runner --------------------------
+def jobs(difficulties, circle_counts, policy, matches, chunk, seed, max_ticks):
+    for difficulty in difficulties:
+        for circles in circle_counts:
+            for start in range(0, matches, chunk):
+                yield (difficulty, circles, policy, seed + start, min(chunk, matches - start), max_ticks)
+
+
+def run_batch(difficulties, circle_counts, policy="greedy", matches=1000, workers=None,
+              chunk=250, seed=0, max_ticks=gb.TICK_RATE * 300, out=None, progress=None):
+    """
+    Run `matches` seeded matches per (difficulty, circles) group across a
+    process pool and return {(difficulty, circles): GroupStats}.
+    At most a few chunks per worker are in flight at once; finished rows
+    go straight to the CSV file `out` (if given).
+    """
+    workers = workers or os.cpu_count() or 1
+    stats = {(d, c): GroupStats() for d in difficulties for c in circle_counts}
+    pending = jobs(difficulties, circle_counts, policy, matches, chunk, seed, max_ticks)
+    total = len(stats) * matches
+    done = 0
+
+    f = open_output(out) if out else None
+    try:
+        writer = None
+        if f is not None:
+            writer = csv.writer(f)
+            writer.writerow(CSV_FIELDS)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = set()
+            while True:
+                for job in pending:
+                    in_flight.add(pool.submit(run_chunk, *job))
+                    if len(in_flight) >= workers * 3:
+                        break
+                if not in_flight:
+                    break
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    difficulty, circles, rows = fut.result()
+                    group = stats[(difficulty, circles)]
+                    speed = gb.DIFFICULTY_SPEED[difficulty]
+                    for _, won, ticks, _ in rows:
+                        group.add(won, ticks)
+                    if writer is not None:
+                        writer.writerows((difficulty, speed, circles, policy, s, int(w), t, p)
+                                         for s, w, t, p in rows)
+                    done += len(rows)
+                if progress is not None:
+                    progress(done, total)
+    finally:
+        if f is not None:
+            f.close()
+    return stats
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Circle Eater batch simulator")
+    ap.add_argument("--matches", type=int, default=1000, help="matches per difficulty/circle-count group")
+    ap.add_argument("--difficulties", nargs="+", default=list(gb.DIFFICULTY_SPEED),
+                    choices=list(gb.DIFFICULTY_SPEED))
+    ap.add_argument("--circles", nargs="+", type=int, default=[5, 10, 15, 20])
+    ap.add_argument("--policy", default="greedy", choices=list(POLICIES))
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    ap.add_argument("--chunk", type=int, default=250, help="matches per worker task")
+    ap.add_argument("--seed", type=int, default=0, help="seed of the first match in each group")
+    ap.add_argument("--max-seconds", type=float, default=300, help="simulated time limit per match")
+    ap.add_argument("--out", help="CSV of every match (.gz to compress)")
+    ap.add_argument("--summary", help="write the per-group summary as JSON")
+    args = ap.parse_args()
+
+    def progress(done, total):
+        rate = done / max(1e-9, time.perf_counter() - t0)
+        print(f"\r{done}/{total} matches ({rate:.0f}/s)", end="", flush=True)
+
+    t0 = time.perf_counter()
+    stats = run_batch(args.difficulties, args.circles, args.policy, args.matches, args.workers,
+                      args.chunk, args.seed, int(args.max_seconds * gb.TICK_RATE), args.out, progress)
+    wall = time.perf_counter() - t0
+    print()
+
+    def fmt(v):
+        return "-" if v is None else f"{v:.2f}"
+
+    print(f"{'difficulty':<10} {'circles':>7} {'matches':>8} {'win %':>6} {'mean s':>7} "
+          f"{'p50 s':>7} {'p90 s':>7} {'p99 s':>7} {'max s':>7}")
+    summary = []
+    for (difficulty, circles), group in stats.items():
+        s = group.summary()
+        summary.append(dict(s, difficulty=difficulty, circles=circles, policy=args.policy))
+        print(f"{difficulty:<10} {circles:>7} {s['matches']:>8} {s['win_rate'] * 100:>6.1f} {fmt(s['mean_s']):>7} "
+              f"{fmt(s['p50_s']):>7} {fmt(s['p90_s']):>7} {fmt(s['p99_s']):>7} {fmt(s['max_s']):>7}")
+    matches = sum(g.matches for g in stats.values())
+    print(f"{matches} matches in {wall:.1f} s ({matches / wall:.0f}/s)")
+
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
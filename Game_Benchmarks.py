@@ -0,0 +1,340 @@
+"""
+Benchmarks for the simulation, rendering and persistence hot paths.
+
+Runs under SDL's dummy video/audio drivers, so no window is needed:
+
+    python Game_Benchmarks.py                      # default sizes
+    python Game_Benchmarks.py --full               # adds 10k circles / 1M runs
+    python Game_Benchmarks.py -k sim --out base.json
+    python Game_Benchmarks.py -k sim --compare base.json
+
+Each case reports ops/sec, per-op (per-frame) p50/p95/p99 in ms and the
+peak Python memory of a separate short run (tracemalloc). --out writes
+all of it as JSON, together with the git commit, for later --compare.
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+
+import pygame
+
+import Game_Backend as gb
+import Game_Leaderboard as glb
+import Game_Render as gr
+
+
+# -------------------- Harness -------------------------
+CASES = []
+
+
+def case(name):
+    """Register a benchmark. The function does its setup and returns the
+    zero-argument op that is timed (one call = one op / frame), or a
+    Bench when the op needs untimed upkeep."""
+    def deco(fn):
+        CASES.append((name, fn))
+        return fn
+    return deco
+
+
+# reset() runs untimed after every op (e.g. to refill a match the op
+# used up); close() runs once the case is measured
+Bench = namedtuple("Bench", ["op", "reset", "close"], defaults=(None, None))
+
+
+def prepare(setup):
+    bench = setup()
+    return bench if isinstance(bench, Bench) else Bench(bench)
+
+
+def percentile(sorted_vals, q):
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, int(round(q * (len(sorted_vals) - 1))))
+    return sorted_vals[k]
+
+
+def measure(setup, min_time, max_ops=100000):
+    op, reset, close = prepare(setup)
+    try:
+        op()  # warm-up (fills caches, JIT-free but avoids first-call effects)
+        samples = []
+        clock = time.perf_counter
+        start = clock()
+        while len(samples) < max_ops:
+            if reset is not None:
+                reset()
+            t0 = clock()
+            op()
+            samples.append(clock() - t0)
+            if t0 - start >= min_time and len(samples) >= 5:
+                break
+    finally:
+        if close is not None:
+            close()
+    total = sum(samples)
+    samples.sort()
+    return {
+        "ops": len(samples),
+        "ops_per_sec": len(samples) / total if total > 0 else float("inf"),
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+    }
+
+
+def measure_memory(setup, ops=3):
+    """Peak traced Python memory over setup plus a few ops."""
+    tracemalloc.start()
+    close = None
+    try:
+        op, reset, close = prepare(setup)
+        for _ in range(ops):
+            op()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        if close is not None:
+            close()
+    return peak
+
+
+# -------------------- Simulation ----------------------
+def arena_for(n):
+    """Arena big enough to spawn n circles comfortably."""
+    w = max(gb.ARENA_WIDTH, int((n * 6000) ** 0.5 * 1.25))
+    return w, int(w * 0.8)
+
+
+def circle_counts(full):
+    return [10, 100, 1000, 10000] if full else [10, 100, 1000]
+
+
+def sim_bench(n, w, h, array_engine):
+    """One tick of an n-circle match. Circles drift into the idle player
+    and get eaten, so the match is rebuilt (untimed) whenever one is
+    gone: every tick is measured with all n circles in play."""
+    def fresh():
+        return gb.Match(num_circles=n, rng=random.Random(1), width=w, height=h, array_engine=array_engine)
+    match = [fresh()]
+
+    def reset():
+        if match[0].remaining < n:
+            match[0] = fresh()
+    return Bench(lambda: match[0].step(0), reset)
+
+
+def register_sim(full):
+    for n in circle_counts(full):
+        w, h = arena_for(n)
+
+        def pure(n=n, w=w, h=h):
+            return sim_bench(n, w, h, array_engine=False)
+        case(f"sim.pure.{n}")(pure)
+
+        if gb.HAS_NUMPY:
+            def arrays(n=n, w=w, h=h):
+                return sim_bench(n, w, h, array_engine=True)
+            case(f"sim.numpy.{n}")(arrays)
+
+        def spawn(n=n, w=w, h=h):
+            rng = random.Random(1)
+            player = gb.Player(100, 100, 25, 10, (255, 0, 0))
+            return lambda: gb.spawn_circles(n, player, w, h, rng)
+        case(f"spawn.{n}")(spawn)
+
+
+# -------------------- Persistence ---------------------
+def fake_runs(count, seed=1):
+    rng = random.Random(seed)
+    return [{
+        "time": round(rng.uniform(5, 60), 3),
+        "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} "
+                f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}",
+        "name": rng.choice(["Alex", "Sam", "Kim", "Jo"]),
+    } for _ in range(count)]
+
+
+def leaderboard_sizes(full):
+    return [100, 10000, 100000, 1000000] if full else [100, 10000, 100000]
+
+
+def register_leaderboard(full, tmpdir):
+    for size in leaderboard_sizes(full):
+        def legacy_frame(size=size):
+            # What leaderboard_screen() used to do every frame
+            runs = fake_runs(size)
+            def op():
+                sorted(runs, key=lambda r: r.get("date", ""), reverse=True)
+                sorted(runs, key=lambda r: r.get("time", float("inf")))
+                min(r.get("time", float("inf")) for r in runs)
+            return op
+        case(f"leaderboard.legacy_frame.{size}")(legacy_frame)
+
+        def model_frame(size=size):
+            model = glb.LeaderboardModel({"runs": fake_runs(size)})
+            return lambda: (model.rows("best", size // 2, 8), model.best_time, len(model))
+        case(f"leaderboard.model_frame.{size}")(model_frame)
+
+        def json_add(size=size):
+            path = os.path.join(tmpdir, f"lb_{size}.json")
+            glb.save_json(path, {"runs": fake_runs(size), "best_time": None})
+            board = glb.JsonLeaderboard(path)
+            return lambda: board.add_run({"time": 30.0, "date": "2026-01-01 00:00:00", "name": "B"})
+        case(f"leaderboard.json_add.{size}")(json_add)
+
+        if glb.HAS_SQLITE:
+            def sqlite_board(size):
+                path = os.path.join(tmpdir, f"lb_{size}.db")
+                if not os.path.exists(path):
+                    board = glb.SqliteLeaderboard(path)
+                    board.add_runs(fake_runs(size))
+                    board.close()
+                return glb.SqliteLeaderboard(path)
+
+            def sqlite_add(size=size):
+                board = sqlite_board(size)
+                return Bench(lambda: board.add_run({"time": 30.0, "date": "2026-01-01 00:00:00", "name": "B"}),
+                             close=board.close)
+            case(f"leaderboard.sqlite_add.{size}")(sqlite_add)
+
+            def sqlite_top(size=size):
+                board = sqlite_board(size)
+                def op():
+                    board._invalidate()  # measure the query, not the page cache
+                    board.rows("best", 0, 8)
+                    board.rows("recent", 0, 8)
+                return Bench(op, close=board.close)
+            case(f"leaderboard.sqlite_top.{size}")(sqlite_top)
+
+
+# -------------------- Rendering -----------------------
+def register_render(full):
+    screen = pygame.display.get_surface()
+    font = pygame.font.Font(None, 36)
+
+    # Each text case draws the two HUD lines, render + blit
+    def text_raw():
+        return lambda: (screen.blit(font.render("Points: 12", True, (0, 0, 0)), (0, 0)),
+                        screen.blit(font.render("Time: 12.34 s", True, (0, 0, 0)), (0, 40)))
+    case("render.text.raw")(text_raw)
+
+    def text_cached():
+        cache = gr.TextCache()
+        return lambda: (screen.blit(cache.render(font, "Points: 12", (0, 0, 0)), (0, 0)),
+                        screen.blit(cache.render(font, "Time: 12.34 s", (0, 0, 0)), (0, 40)))
+    case("render.text.cached")(text_cached)
+
+    def hud_atlas():
+        atlas = gr.GlyphAtlas(font, (0, 0, 0))
+        return lambda: (atlas.blit(screen, "12", (0, 0)), atlas.blit(screen, "12.34 s", (0, 40)))
+    case("render.text.atlas")(hud_atlas)
+
+    for n in circle_counts(full):
+        rng = random.Random(1)
+        items = [(rng.uniform(30, 970), rng.uniform(30, 770), rng.randint(10, 30),
+                  (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255))) for _ in range(n)]
+
+        def draw(items=items):
+            def op():
+                for x, y, r, color in items:
+                    pygame.draw.circle(screen, color, (x, y), r)
+            return op
+        case(f"render.circles.draw.{n}")(draw)
+
+        def sprites(items=items, aa=False):
+            cache = gr.CircleSprites(antialias=aa)
+            return lambda: cache.draw_all(screen, items, False)
+        case(f"render.circles.sprites.{n}")(sprites)
+        case(f"render.circles.sprites_aa.{n}")(lambda items=items: sprites(items, True))
+
+    def full_flip():
+        return pygame.display.flip
+    case("render.present.flip")(full_flip)
+
+    def dirty_present():
+        rects = [pygame.Rect(i * 40 % 960, i * 30 % 760, 40, 40) for i in range(40)]
+        return lambda: pygame.display.update(rects)
+    case("render.present.dirty40")(dirty_present)
+
+
+# -------------------- Runner --------------------------
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Circle Eater benchmarks")
+    ap.add_argument("-k", "--filter", default="", help="only run cases whose name contains this")
+    ap.add_argument("--full", action="store_true", help="include the largest sizes (slow)")
+    ap.add_argument("--min-time", type=float, default=0.5, help="seconds to time each case")
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    ap.add_argument("--out", help="write results as JSON")
+    ap.add_argument("--compare", help="JSON from an earlier --out to diff against")
+    args = ap.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((gb.ARENA_WIDTH, gb.ARENA_HEIGHT))
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = {c["name"]: c for c in json.load(f)["cases"]}
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        register_sim(args.full)
+        register_leaderboard(args.full, tmpdir)
+        register_render(args.full)
+
+        print(f"{'case':<38} {'ops/s':>11} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak KiB':>9}")
+        for name, setup in CASES:
+            if args.filter not in name:
+                continue
+            res = measure(setup, args.min_time)
+            res["name"] = name
+            res["peak_bytes"] = None if args.no_memory else measure_memory(setup)
+            results.append(res)
+
+            peak = "-" if res["peak_bytes"] is None else f"{res['peak_bytes'] / 1024:.0f}"
+            line = (f"{name:<38} {res['ops_per_sec']:>11.1f} {res['p50_ms']:>9.3f} "
+                    f"{res['p95_ms']:>9.3f} {res['p99_ms']:>9.3f} {peak:>9}")
+            old = baseline.get(name)
+            if old:
+                line += f"  ({(res['ops_per_sec'] / old['ops_per_sec'] - 1) * 100:+.1f}% ops/s)"
+            print(line, flush=True)
+
+    if args.out:
+        report = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": gb.HAS_NUMPY,
+            "platform": platform.platform(),
+            "cases": results,
+        }
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+import json
+import logging
+import os
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import sqlite3
+except ImportError:  # some minimal Python builds ship without it
+    sqlite3 = None
+
+HAS_SQLITE = sqlite3 is not None
+
+log = logging.getLogger(__name__)
+
+
+# -------------------- JSON file -------------------------
+def load_json(path):
+    if not os.path.exists(path):
+        return {"runs": [], "best_time": None}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if "runs" not in data or not isinstance(data["runs"], list):
+            data["runs"] = []
+        if "best_time" not in data or (data["best_time"] is not None and not isinstance(data["best_time"], (int, float))):
+            data["best_time"] = None
+        return data
+    except Exception:
+        # Backup corrupted file and start fresh
+        try:
+            os.rename(path, path + ".bak")
+        except Exception:
+            pass
+        return {"runs": [], "best_time": None}
+
+
+def save_json(path, data, indent=2):
+    # Write to a temp file and swap it in, so a crash can't leave half a file
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    os.replace(tmp, path)
+
+
+def _run_time(run):
+    return run.get("time", float("inf"))
+
+
+def _run_date(run):
+    return run.get("date", "")
+
+
+# -------------------- In-memory model ------------------
+class LeaderboardModel:
+    """
+    In-memory view of the leaderboard, loaded once.
+    Keeps the "recent" and "best" orderings ready so a screen only does
+    O(visible rows) work per frame. Orderings are built lazily, updated in
+    place by add_run() and dropped by clear().
+    """
+    def __init__(self, data=None):
+        data = data or {}
+        self.runs = list(data.get("runs", []))
+        self._best = None     # runs by time, ascending (ties: oldest first)
+        self._best_keys = None
+        self._recent = None   # runs by date, ascending (ties: newest first)
+        self._recent_keys = None
+
+    def __len__(self):
+        return len(self.runs)
+
+    # ----- Orderings -----
+    def _build(self):
+        # Same tie order as sorted(runs, key=date, reverse=True) when read
+        # back to front, and as sorted(runs, key=time) front to back.
+        self._best = sorted(self.runs, key=_run_time)
+        self._best_keys = [_run_time(r) for r in self._best]
+        self._recent = sorted(reversed(self.runs), key=_run_date)
+        self._recent_keys = [_run_date(r) for r in self._recent]
+
+    def rows(self, mode, start, count):
+        """Return up to `count` runs from position `start` in the given
+        ordering ("recent" = newest first, "best" = fastest first)."""
+        if self._best is None:
+            self._build()
+        end = min(len(self.runs), start + count)
+        if mode == "recent":
+            n = len(self._recent)
+            return [self._recent[n - 1 - i] for i in range(start, end)]
+        return self._best[start:end]
+
+    @property
+    def best_time(self):
+        if not self.runs:
+            return None
+        if self._best is None:
+            self._build()
+        t = self._best_keys[0]
+        return None if t == float("inf") else t
+
+    # ----- Mutations -----
+    def add_run(self, run):
+        """Record a run that was just saved; returns its rank by time (1-based)."""
+        self.runs.append(run)
+        t = _run_time(run)
+        if self._best is None:
+            self._build()
+            return bisect_right(self._best_keys, t)
+        i = bisect_right(self._best_keys, t)
+        self._best.insert(i, run)
+        self._best_keys.insert(i, t)
+        d = _run_date(run)
+        j = bisect_left(self._recent_keys, d)
+        self._recent.insert(j, run)
+        self._recent_keys.insert(j, d)
+        return i + 1
+
+    def clear(self):
+        self.runs = []
+        self._best = self._best_keys = None
+        self._recent = self._recent_keys = None
+
+
+# -------------------- Storage backends ------------------
+# Every backend has the LeaderboardModel interface:
+#   len(board), board.rows(mode, start, count), board.best_time,
+#   board.add_run(run) -> rank, board.clear()
+
+class JsonLeaderboard(LeaderboardModel):
+    """The original leaderboard.json, rewritten whole on every change."""
+    def __init__(self, path):
+        self.path = path
+        super().__init__(load_json(path))
+
+    def _save(self):
+        save_json(self.path, {"runs": self.runs, "best_time": self.best_time})
+
+    def add_run(self, run):
+        rank = super().add_run(run)
+        self._save()
+        return rank
+
+    def clear(self):
+        super().clear()
+        self._save()
+
+
+class SqliteLeaderboard:
+    """
+    Leaderboard in an indexed SQLite file. Inserts are single-row and
+    top-N / page queries walk the time or date index, so both stay fast
+    with millions of runs. Pages are fetched by key (after the last row
+    seen) rather than OFFSET, so scrolling deep into the history costs
+    the same as the first page. Small results (count, best, the last
+    page asked for) are cached until the next write.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            id   INTEGER PRIMARY KEY AUTOINCREMENT,
+            time REAL NOT NULL,
+            date TEXT NOT NULL,
+            name TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_runs_time ON runs(time, id);
+        CREATE INDEX IF NOT EXISTS idx_runs_date ON runs(date DESC, id);
+        CREATE INDEX IF NOT EXISTS idx_runs_name ON runs(name, time);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    """
+
+    # (sort column, ascending); ties match the in-memory model: oldest
+    # insert (lowest id) first
+    KEYS = {
+        "best": ("time", True),
+        "recent": ("date", False),
+    }
+    MAX_CURSORS = 4096   # remembered row keys, for paging by key
+
+    def __init__(self, path):
+        if sqlite3 is None:
+            raise RuntimeError("SqliteLeaderboard requires the sqlite3 module")
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        try:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(self.SCHEMA)
+            self.conn.commit()
+        except sqlite3.DatabaseError:
+            self.conn.close()
+            raise
+        self._invalidate()
+
+    def _invalidate(self):
+        self._count = None
+        self._best = None
+        self._page_key = None
+        self._page = None
+        self._cursors = {}   # (mode, position) -> (sort value, id)
+
+    def close(self):
+        self.conn.close()
+
+    # ----- Queries -----
+    def __len__(self):
+        if self._count is None:
+            self._count = self.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        return self._count
+
+    @property
+    def best_time(self):
+        if self._best is None:
+            self._best = (self.conn.execute("SELECT MIN(time) FROM runs").fetchone()[0],)
+        return self._best[0]
+
+    def rows(self, mode, start, count):
+        mode = "recent" if mode == "recent" else "best"
+        key = (mode, start, count)
+        if key != self._page_key:
+            self._page = self._fetch_page(mode, start, count)
+            self._page_key = key
+        return self._page
+
+    def _fetch_page(self, mode, start, count):
+        """
+        Seek to the page from the nearest known row key: the row just
+        before it (scrolling down), the row just after it (scrolling up)
+        or the end of the table (jumping to the last page). Only a jump
+        into the middle without any known neighbour falls back to OFFSET.
+        """
+        before = self._cursors.get((mode, start - 1))
+        after = self._cursors.get((mode, start + count))
+        if start == 0:
+            rows = self._select(mode, "", (), False, count)
+        elif before is not None:
+            rows = self._select(mode, *self._seek(mode, before, True), False, count)
+        elif after is not None:
+            rows = self._select(mode, *self._seek(mode, after, False), True, count)
+        else:
+            total = len(self)
+            if start >= total:
+                return []
+            if start + count >= total:
+                rows = self._select(mode, "", (), True, total - start)
+            else:
+                rows = self._select(mode, "", (), False, count, offset=start)
+
+        if len(self._cursors) > self.MAX_CURSORS:
+            self._cursors = {}
+        col = 1 if mode == "best" else 2
+        for i, row in enumerate(rows, start=start):
+            self._cursors[(mode, i)] = (row[col], row[0])
+        return [{"time": t, "date": d, "name": n} for _, t, d, n in rows]
+
+    def _seek(self, mode, key, forward):
+        """WHERE clause for the rows after (forward) or before `key`. The
+        range test on the sort column lets SQLite walk its index."""
+        col, asc = self.KEYS[mode]
+        value, row_id = key
+        if asc == forward:
+            return f"WHERE {col} >= ? AND ({col} > ? OR id {'>' if forward else '<'} ?)", (value, value, row_id)
+        return f"WHERE {col} <= ? AND ({col} < ? OR id {'>' if forward else '<'} ?)", (value, value, row_id)
+
+    def _select(self, mode, where, params, reverse, limit, offset=0):
+        """(id, time, date, name) rows in page order; reverse=True reads
+        them backwards from the end of the range (LIMIT counts from there)."""
+        col, asc = self.KEYS[mode]
+        direction = "ASC" if asc != reverse else "DESC"
+        id_direction = "DESC" if reverse else "ASC"
+        cur = self.conn.execute(
+            f"SELECT id, time, date, name FROM runs {where} "
+            f"ORDER BY {col} {direction}, id {id_direction} LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        )
+        rows = cur.fetchall()
+        if reverse:
+            rows.reverse()
+        return rows
+
+    def rank_of(self, time_s):
+        """1-based rank a run with this time has (after equal times)."""
+        return self.conn.execute("SELECT COUNT(*) FROM runs WHERE time <= ?", (time_s,)).fetchone()[0]
+
+    # ----- Mutations -----
+    def _insert(self, runs):
+        self.conn.executemany(
+            "INSERT INTO runs (time, date, name) VALUES (?, ?, ?)",
+            [(float(r.get("time", float("inf"))), r.get("date", ""), r.get("name", "Player")) for r in runs],
+        )
+
+    def add_runs(self, runs):
+        with self.conn:
+            self._insert(runs)
+        self._invalidate()
+
+    def add_run(self, run):
+        self.add_runs([run])
+        return self.rank_of(float(run.get("time", float("inf"))))
+
+    def clear(self):
+        self.conn.execute("DELETE FROM runs")
+        self.conn.commit()
+        self._invalidate()
+
+    # ----- Migration -----
+    def migrate_json(self, json_path):
+        """
+        One-time import of an existing leaderboard.json. The JSON file is
+        left untouched; a meta flag stops it being imported twice.
+        Returns the number of runs imported.
+        """
+        done = self.conn.execute("SELECT value FROM meta WHERE key = 'json_migrated'").fetchone()
+        if done is not None:
+            return 0
+        runs = load_json(json_path).get("runs", []) if os.path.exists(json_path) else []
+        # Runs and flag in one transaction: a crash can't import them twice
+        with self.conn:
+            self._insert(runs)
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)", (json_path,))
+        self._invalidate()
+        return len(runs)
+
+
+def open_leaderboard(backend, json_path, db_path):
+    """Open the configured backend ("sqlite" or "json"); SQLite migrates
+    the JSON history on first open and falls back to JSON if unavailable."""
+    if backend == "sqlite" and HAS_SQLITE:
+        try:
+            board = SqliteLeaderboard(db_path)
+        except sqlite3.DatabaseError as e:
+            # Like a corrupt leaderboard.json: keep it as .bak, start fresh
+            # (the JSON history, if any, is imported again below)
+            log.warning("leaderboard database %s is unreadable (%s); moved to .bak", db_path, e)
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(db_path + suffix):
+                    os.replace(db_path + suffix, db_path + ".bak" + suffix)
+            board = SqliteLeaderboard(db_path)
+        board.migrate_json(json_path)
+        return board
+    return JsonLeaderboard(json_path)
+
+
+# -------------------- Recording ---------------------------
+RecordResult = namedtuple("RecordResult", ["is_new", "prev_best", "best", "rank"])
+
+
+def record_run(board, run):
+    """Add a run and report record status, previous best and rank in one pass."""
+    prev_best = board.best_time
+    t = float(run["time"])
+    is_new = (prev_best is None) or (t < prev_best - 1e-9)
+    rank = board.add_run(run)
+    return RecordResult(is_new, prev_best, t if is_new else prev_best, rank)
+
+
+class LeaderboardService:
+    """
+    Owns a leaderboard backend on a single background thread.
+    Opening the backend and every write (record, clear) happen on that
+    thread, in submission order, and finish before interpreter exit;
+    record() returns a Future the caller can poll once per frame.
+    Reads are not routed through the worker: board() hands the backend
+    to the caller once the queue is drained, for screens that page
+    through it while no run is being recorded.
+    """
+    def __init__(self, opener):
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="leaderboard")
+        self._board = self._pool.submit(opener)
+
+    def record(self, run):
+        """Queue a run; the Future resolves to a RecordResult."""
+        return self._pool.submit(lambda: record_run(self._board.result(), run))
+
+    def run(self, fn, *args):
+        """Queue another storage job (e.g. saving a replay) behind the writes."""
+        return self._pool.submit(fn, *args)
+
+    def clear(self):
+        """Delete every run on the worker; blocks until done."""
+        self._pool.submit(lambda: self._board.result().clear()).result()
+
+    def board(self):
+        """Return the backend once it is open and all queued writes are done."""
+        self._pool.submit(lambda: None).result()
+        return self._board.result()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
@@ -1,28 +1,22 @@
-import pygame
-import random
-import json
+import logging
 import os
+import pygame
 from datetime import datetime
 import Game_Backend as gb
-
-# -------------------- Pygame Setup --------------------
-pygame.init()
+import Game_Leaderboard as glb
+import Game_Settings as gs
+import Game_Render as gr
+import Game_Assets as ga
+import Game_Perf as gp
+import Game_Online as go
+
+# Importing this module has no side effects: the window, mixer, fonts,
+# sounds and saved settings are set up by App, which main() creates.
 WIDTH, HEIGHT = 1000, 800
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Circle Eater")
-clock = pygame.time.Clock()
-
-# -------------------- Fonts & Colors -------------------
-FONT = pygame.font.Font(None, 36)
-SMALL_FONT = pygame.font.Font(None, 28)
-BIG_FONT = pygame.font.Font(None, 72)
-TITLE_FONT = pygame.font.Font(None, 84)
 
-try:
-    MONO_FONT = pygame.font.SysFont("consolas", 24)
-except Exception:
-    MONO_FONT = SMALL_FONT
+log = logging.getLogger(__name__)
 
+# -------------------- Colors --------------------------
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 GRAY = (220, 220, 220)
@@ -31,17 +25,25 @@ ACCENT = (0, 180, 0)
 RED = (220, 40, 40)
 SHADOW = (0, 0, 0, 140)
 
-# -------------------- Sounds / Music --------------------
-Button_Click_sfx = pygame.mixer.Sound("./Assets/sfx/pickupCoin.wav")
-Enemy_Kill_sfx = pygame.mixer.Sound("./Assets/sfx/powerUp.wav")
+# -------------------- Text cache ----------------------
+# Rendered text is reused across frames; the HUD numbers are composed
+# from a digit atlas (App.hud_digits) so only static labels are rasterized.
+TEXT_CACHE = gr.TextCache(max_bytes=8 * 1024 * 1024)
 
-Music_Background = pygame.mixer.Sound("./Assets/music/background_music.mp3")
-
-MUSIC_CHANNEL = None
+def render_text(font, text, color):
+    return TEXT_CACHE.render(font, text, color)
 
 # -------------------- Storage Paths -------------------
 LEADERBOARD_PATH = "./Assets/save_files/leaderboard.json"
+LEADERBOARD_DB_PATH = "./Assets/save_files/leaderboard.db"
+LEADERBOARD_BACKEND = "sqlite"   # "sqlite" (indexed) or "json" (legacy file)
 SETTINGS_PATH = "Assets/save_files/settings.json"
+REPLAY_DIR = "./Assets/save_files/replays"   # one file per won run
+ONLINE_OUTBOX_PATH = "./Assets/save_files/online_outbox.json"   # runs not yet uploaded
+
+# Online leaderboard base URL, e.g. "http://127.0.0.1:8765" for
+# `python Game_Online.py --serve --port 8765`; None keeps runs local only
+ONLINE_LEADERBOARD_URL = None
 
 # -------------------- Settings ------------------------
 DEFAULT_SETTINGS = {
@@ -53,33 +55,26 @@ DEFAULT_SETTINGS = {
 }
 
 # -------------- Load / Save settings ------------------
+# Saves are debounced onto a background thread; main() closes the
+# writer on exit, which writes anything still pending
+SETTINGS_WRITER = gs.DebouncedWriter(SETTINGS_PATH, delay=0.5)
+
 def load_settings():
-    data = DEFAULT_SETTINGS.copy()
-    if os.path.exists(SETTINGS_PATH):
-        try:
-            with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
-                raw = json.load(f)
-            for k, v in DEFAULT_SETTINGS.items():
-                data[k] = raw.get(k, v)
-        except Exception:
-            pass
-    return data
+    return gs.load_settings(SETTINGS_PATH, DEFAULT_SETTINGS)
 
 def save_settings(data):
-    with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    """Schedule a save; rapid calls (e.g. a slider drag) coalesce into one write."""
+    SETTINGS_WRITER.submit(data)
 
-SETTINGS = load_settings()
+SETTINGS = DEFAULT_SETTINGS.copy()   # loaded from file by App
 
 # Apply the settings from file if file exits
 def apply_display_settings():
-    global screen
     flags = pygame.FULLSCREEN if SETTINGS.get("fullscreen") else 0
     # Recreate display; keep logical width/height
-    screen = pygame.display.set_mode((WIDTH, HEIGHT), flags)
+    APP.screen = pygame.display.set_mode((WIDTH, HEIGHT), flags)
 
 def apply_audio_settings():
-    global MUSIC_CHANNEL
     # SFX volume = master × sfx
     eff_sfx = float(SETTINGS.get("master_volume", 1.0)) * float(SETTINGS.get("sfx_volume", 1.0))
     eff_sfx = max(0.0, min(1.0, eff_sfx))
@@ -89,83 +84,178 @@ def apply_audio_settings():
     eff_music = max(0.0, min(1.0, eff_music))
 
     # Apply to SFX sound objects (future plays use this)
-    Button_Click_sfx.set_volume(eff_sfx)
-    Enemy_Kill_sfx.set_volume(eff_sfx)
+    APP.click_sfx.set_volume(eff_sfx)
+    APP.eat_sfx.set_volume(eff_sfx)
 
     # Apply to the currently playing music channel (affects live playback)
-    if MUSIC_CHANNEL is not None:
+    if APP.music_channel is not None:
         try:
-            MUSIC_CHANNEL.set_volume(eff_music)
+            APP.music_channel.set_volume(eff_music)
         except Exception:
             pass
     else:
-        Music_Background.set_volume(eff_music) 
+        APP.music.set_volume(eff_music) 
 
 def apply_all_settings():
     apply_display_settings()
     apply_audio_settings()
 
-apply_all_settings()
+# -------------------- App Context ---------------------
+class App:
+    """
+    Everything with side effects: pygame/display/mixer init, fonts,
+    sounds and loading the saved settings. main() creates one through
+    init_app(); headless=True selects SDL's dummy video/audio drivers
+    for bots, tests and benchmarks.
+    """
+    def __init__(self, headless=False):
+        if headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+        # Pygame setup
+        pygame.init()
+        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Circle Eater")
+        self.clock = pygame.time.Clock()
+
+        # Fonts (CountingFont lets the perf overlay count text surfaces)
+        self.font = gp.CountingFont(None, 36)
+        self.small_font = gp.CountingFont(None, 28)
+        self.big_font = gp.CountingFont(None, 72)
+        self.title_font = gp.CountingFont(None, 84)
+        try:
+            self.mono_font = gp.CountingFont(pygame.font.match_font("consolas"), 24)
+        except Exception:
+            self.mono_font = self.small_font
+        self.hud_digits = gr.GlyphAtlas(self.font, BLACK, chars="0123456789.: s")
+
+        # Sounds / Music: registered only; SFX decode in the background
+        # and music streams from disk. Effects share a bounded voice pool:
+        # eats are merged per frame and capped at ~25/s, and UI clicks
+        # outrank them for voices.
+        self.assets = ga.AssetManager()
+        self.sfx = ga.SfxDispatcher(voices=8)
+        self.click_sfx = self.sfx.add(self.assets.sound("click", "./Assets/sfx/pickupCoin.wav"),
+                                      priority=1, min_interval_ms=30)
+        self.eat_sfx = self.sfx.add(self.assets.sound("eat", "./Assets/sfx/powerUp.wav"),
+                                    priority=0, min_interval_ms=40)
+        self.music = self.assets.music("music", "./Assets/music/background_music.mp3")
+        self.music_channel = None
+        self.assets.preload_async()
+
+        # Settings from file (SETTINGS holds defaults until now)
+        SETTINGS.update(load_settings())
+
+    def stop_music(self):
+        if self.music_channel is not None:
+            self.music_channel.stop()
+            self.music_channel = None
+
+# The running App; None until init_app()
+APP = None
+
+def init_app(headless=False):
+    global APP
+    APP = App(headless=headless)
+    apply_all_settings()
+    PERF.watch("sfx_merged", lambda: APP.sfx.merged)
+    PERF.watch("sfx_dropped", lambda: APP.sfx.rate_limited + APP.sfx.dropped)
+    PERF.info("assets", APP.assets.report)
+    return APP
+
+# -------------------- Performance overlay -------------
+# F3 shows frame timings for the current screen, Shift+F3 also streams
+# them to perf_trace.json. Disabled, each hook is a single flag check.
+PERF = gp.PerfMonitor()
+
+def surfaces_created():
+    n = gp.CountingFont.rendered + OVERLAY_BLUR.allocations
+    if CIRCLE_SPRITES is not None:
+        n += CIRCLE_SPRITES.rasterized
+    return n
+
+PERF.watch("surfaces", surfaces_created)
 
 # -------------------- Leaderboard Storage --------------
 def load_leaderboard():
-    if not os.path.exists(LEADERBOARD_PATH):
-        return {"runs": [], "best_time": None}
-    try:
-        with open(LEADERBOARD_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        if "runs" not in data or not isinstance(data["runs"], list):
-            data["runs"] = []
-        if "best_time" not in data or (data["best_time"] is not None and not isinstance(data["best_time"], (int, float))):
-            data["best_time"] = None
-        return data
-    except Exception:
-        # Backup corrupted file and start fresh
-        try:
-            os.rename(LEADERBOARD_PATH, LEADERBOARD_PATH + ".bak")
-        except Exception:
-            pass
-        return {"runs": [], "best_time": None}
+    return glb.load_json(LEADERBOARD_PATH)
 
 def save_leaderboard(data):
-    with open(LEADERBOARD_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    glb.save_json(LEADERBOARD_PATH, data)
 
-def add_run_and_check_record(final_time_s, player_name):
+# Leaderboard backend behind a background thread; opened on first use
+LEADERBOARD_SERVICE = None
+
+def get_leaderboard_service():
+    global LEADERBOARD_SERVICE
+    if LEADERBOARD_SERVICE is None:
+        LEADERBOARD_SERVICE = glb.LeaderboardService(
+            lambda: glb.open_leaderboard(LEADERBOARD_BACKEND, LEADERBOARD_PATH, LEADERBOARD_DB_PATH)
+        )
+    return LEADERBOARD_SERVICE
+
+# Uploads runs in batches on its own thread; created on first use
+ONLINE_SYNC = None
+
+def get_online_sync():
+    """The online uploader, or None when ONLINE_LEADERBOARD_URL is unset."""
+    global ONLINE_SYNC
+    if ONLINE_SYNC is None and ONLINE_LEADERBOARD_URL:
+        ONLINE_SYNC = go.LeaderboardSync(ONLINE_LEADERBOARD_URL, ONLINE_OUTBOX_PATH)
+    return ONLINE_SYNC
+
+def get_leaderboard_model():
+    """The open backend, after any queued writes have landed (blocks)."""
+    return get_leaderboard_service().board()
+
+def submit_run(final_time_s, player_name, replay=None):
     """
-    Append a run; also keep legacy 'best_time' updated.
-    Each run now has: time (float), date (str), name (str).
+    Record a run in the background.
+    Returns a Future resolving to glb.RecordResult(is_new, prev_best, best, rank).
+    Each run has: time (float), date (str), name (str).
+    A gb.Replay, if given, is saved next to it as REPLAY_DIR/<date>.json
+    (down to the microsecond, so quick wins never share a file).
+    The run is also queued for the online leaderboard, if one is set.
     """
-    data = load_leaderboard()
-    prev_best = data.get("best_time", None)
-    is_new = (prev_best is None) or (final_time_s < prev_best - 1e-9)
-
+    now = datetime.now()
     run = {
         "time": float(final_time_s),
-        "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "date": now.strftime("%Y-%m-%d %H:%M:%S"),
         "name": player_name if player_name else "Player"
     }
+    service = get_leaderboard_service()
+    result = service.record(run)
+    sync = get_online_sync()
+    if sync is not None:
+        sync.submit(run)
+    if replay is not None:
+        data = dict(replay.to_dict(), **run)
+        path = os.path.join(REPLAY_DIR, now.strftime("%Y%m%d-%H%M%S-%f") + ".json")
+        service.run(save_replay, path, data)
+    return result
+
+def save_replay(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    glb.save_json(path, data, indent=None)
 
-    data.setdefault("runs", []).append(run)
-
-    if is_new:
-        data["best_time"] = float(final_time_s)
-
-    save_leaderboard(data)
-    return is_new, data["best_time"]
+def add_run_and_check_record(final_time_s, player_name):
+    """Blocking form of submit_run(); returns (is_new, best_time)."""
+    result = submit_run(final_time_s, player_name).result()
+    return result.is_new, result.best
 
 # -------------------- UI Helpers ----------------------
 def draw_centered(surface, surf, y_offset=0):
     rect = surf.get_rect(center=(WIDTH // 2, HEIGHT // 2 + y_offset))
     surface.blit(surf, rect)
 
+# Shared, preallocated blur/dim buffers for dialogs and the win screen
+OVERLAY_BLUR = gr.OverlayBlur(shadow=SHADOW)
+
 def blur_surface(source_surf, factor=8):
-    if factor < 2:
-        return source_surf.copy()
-    small = pygame.transform.smoothscale(
-        source_surf, (max(1, WIDTH // factor), max(1, HEIGHT // factor))
-    )
-    return pygame.transform.smoothscale(small, (WIDTH, HEIGHT))
+    """Blurred copy of source_surf. Returns OVERLAY_BLUR's reused output
+    buffer, so blit it before blurring something else."""
+    return OVERLAY_BLUR.blur(source_surf, factor, dim=False)
 
 # Name Tag Drawing 
 def draw_name_tag(surface, text, x, y, radius, y_gap=6):
@@ -174,14 +264,14 @@ def draw_name_tag(surface, text, x, y, radius, y_gap=6):
     midbottom = (x, y - radius - y_gap)
 
     # Outline for readability
-    label_main = SMALL_FONT.render(text, True, (255, 255, 255))  # white text
-    label_shadow = SMALL_FONT.render(text, True, (0, 0, 0))      # black outline
+    label_main = render_text(APP.small_font, text, (255, 255, 255))  # white text
+    label_shadow = render_text(APP.small_font, text, (0, 0, 0))      # black outline
 
     rect = label_main.get_rect(midbottom=midbottom)
     # simple 4-direction outline
-    for dx, dy in ((1,0),(-1,0),(0,1),(0,-1)):
-        surface.blit(label_shadow, rect.move(dx, dy))
+    surface.blits([(label_shadow, rect.move(dx, dy)) for dx, dy in ((1,0),(-1,0),(0,1),(0,-1))], False)
     surface.blit(label_main, rect)
+    return rect.inflate(2, 2)
 
 
 class Button:
@@ -203,7 +293,7 @@ class Button:
             border = DARK
         pygame.draw.rect(surface, bg, self.rect, border_radius=18)
         pygame.draw.rect(surface, border, self.rect, 3, border_radius=18)
-        label = FONT.render(self.text, True, fg)
+        label = render_text(APP.font, self.text, fg)
         label_rect = label.get_rect(center=self.rect.center)
         surface.blit(label, label_rect)
 
@@ -242,12 +332,12 @@ class Slider:
             if (mx - hx) ** 2 + (my - hy) ** 2 <= (self.handle_radius + 4) ** 2 or self.track_rect.collidepoint(mx, my):
                 self.dragging = True
                 self._set_value_from_mouse(mx)
-                Button_Click_sfx.play()
+                APP.click_sfx.play()
                 return True
         elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
             if self.dragging:
                 self.dragging = False
-                Button_Click_sfx.play()
+                APP.click_sfx.play()
                 return True
         elif event.type == pygame.MOUSEMOTION and self.dragging:
             self._set_value_from_mouse(event.pos[0])
@@ -265,11 +355,8 @@ def text_input_dialog(prompt, default_text="Player", max_len=16):
     Esc to cancel (returns default_text). Enter to accept.
     """
     # Capture background and dim
-    captured = screen.copy()
-    blurred = blur_surface(captured, factor=12)
-    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-    overlay.fill(SHADOW)
-    blurred.blit(overlay, (0, 0))
+    # (blur finishes over the first few frames; no full-screen allocations)
+    OVERLAY_BLUR.begin(APP.screen, factor=12)
 
     # Input box
     box_w, box_h = 520, 160
@@ -283,20 +370,19 @@ def text_input_dialog(prompt, default_text="Player", max_len=16):
 
     while True:
         for event in pygame.event.get():
+            if PERF.handle_event(event):
+                continue
             if event.type == pygame.QUIT:
                 return "".join(text) if text else default_text
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_RETURN:
-                    Button_Click_sfx.play()
+                    APP.click_sfx.play()
                     s = "".join(text).strip()
                     return s if s else default_text
                 elif event.key == pygame.K_ESCAPE:
-                    Button_Click_sfx.play()
+                    APP.click_sfx.play()
                     # stop music politely if dialog was opened while it played
-                    global MUSIC_CHANNEL
-                    if MUSIC_CHANNEL is not None:
-                        MUSIC_CHANNEL.stop()
-                        MUSIC_CHANNEL = None
+                    APP.stop_music()
                     return default_text
                 elif event.key == pygame.K_BACKSPACE:
                     if text:
@@ -306,265 +392,214 @@ def text_input_dialog(prompt, default_text="Player", max_len=16):
                     if ch and ch.isprintable() and len(text) < max_len:
                         text.append(ch)
 
+        PERF.mark("events")
+
         # Blink caret
-        caret_timer += clock.get_time()
+        caret_timer += APP.clock.get_time()
         if caret_timer >= caret_interval:
             caret_visible = not caret_visible
             caret_timer = 0
 
         # Draw dialog
-        screen.blit(blurred, (0, 0))
+        APP.screen.blit(OVERLAY_BLUR.step(), (0, 0))
         # Card
-        pygame.draw.rect(screen, WHITE, box_rect, border_radius=18)
-        pygame.draw.rect(screen, DARK, box_rect, 3, border_radius=18)
+        pygame.draw.rect(APP.screen, WHITE, box_rect, border_radius=18)
+        pygame.draw.rect(APP.screen, DARK, box_rect, 3, border_radius=18)
 
-        title = FONT.render(prompt, True, BLACK)
-        screen.blit(title, (box_rect.x + 24, box_rect.y + 16))
+        title = APP.font.render(prompt, True, BLACK)
+        APP.screen.blit(title, (box_rect.x + 24, box_rect.y + 16))
 
         # Text line
         content = "".join(text)
-        text_surf = BIG_FONT.render(content, True, ACCENT)
+        text_surf = APP.big_font.render(content, True, ACCENT)
         tx = box_rect.x + 24
         ty = box_rect.y + 64
-        screen.blit(text_surf, (tx, ty))
+        APP.screen.blit(text_surf, (tx, ty))
 
         # Caret
         if caret_visible:
             caret_x = tx + text_surf.get_width() + 6
             caret_y = ty + 6
-            pygame.draw.rect(screen, ACCENT, (caret_x, caret_y, 3, text_surf.get_height() - 12))
+            pygame.draw.rect(APP.screen, ACCENT, (caret_x, caret_y, 3, text_surf.get_height() - 12))
 
-        hint = SMALL_FONT.render("Enter = OK    •    Esc = Cancel", True, DARK)
-        screen.blit(hint, (box_rect.centerx - hint.get_width() // 2, box_rect.bottom - 34))
+        hint = APP.small_font.render("Enter = OK    •    Esc = Cancel", True, DARK)
+        APP.screen.blit(hint, (box_rect.centerx - hint.get_width() // 2, box_rect.bottom - 34))
 
+        PERF.draw(APP.screen)
+        PERF.mark("draw")
         pygame.display.flip()
-        clock.tick(60)
+        PERF.mark("flip")
+        APP.clock.tick(60)
+        PERF.end_frame("dialog")
 
 # -------------------- Game Classes --------------------
-class Circle:
-    def __init__(self, circles, player):
-        self.r = random.randint(10, 30)
-        self.color = (
-            random.randint(0, 255),
-            random.randint(0, 255),
-            random.randint(0, 255),
-        )
-        # Try random positions until we don't overlap circles or player
-        while True:
-            self.x = random.randint(50, WIDTH - 50)
-            self.y = random.randint(50, HEIGHT - 50)
-
-            no_circle_overlap = all(not self.check_collision(other) for other in circles)
-            no_player_overlap = not self.check_collision_player(player)
-
-            if no_circle_overlap and no_player_overlap:
-                break
-
-    def draw(self, surf):
-        pygame.draw.circle(surf, self.color, (self.x, self.y), self.r)
-
-    def check_collision(self, other):
-        dx = self.x - other.x
-        dy = self.y - other.y
-        dist_sq = dx * dx + dy * dy
-        rs = self.r + other.r
-        return dist_sq < rs * rs
-
-    def check_collision_player(self, player):
-        dx = self.x - player.x
-        dy = self.y - player.y
-        dist_sq = dx * dx + dy * dy
-        rs = self.r + player.radius
-        return dist_sq <= rs * rs
+# Circle lives in the backend so the simulation can run headless
+Circle = gb.Circle
 
 # -------------------- Difficulty helpers ----------------
 def get_difficulty_speed_multiplier():
     diff = SETTINGS.get("difficulty", "Normal")
-    if diff == "Easy":
-        return 0.75
-    if diff == "Hard":
-        return 1.25
-    return 1.0  # Normal
+    return gb.DIFFICULTY_SPEED.get(diff, 1.0)  # unknown -> Normal
+
+def read_inputs(keys):
+    """Map held arrow keys to gb.INPUT_* bits."""
+    inputs = 0
+    if keys[pygame.K_LEFT]:
+        inputs |= gb.INPUT_LEFT
+    if keys[pygame.K_RIGHT]:
+        inputs |= gb.INPUT_RIGHT
+    if keys[pygame.K_UP]:
+        inputs |= gb.INPUT_UP
+    if keys[pygame.K_DOWN]:
+        inputs |= gb.INPUT_DOWN
+    return inputs
+
+# Draw positions blended between the last two simulation ticks
+RENDER_INTERPOLATION = True
+# Gameplay presents dirty rects; above this share of the screen it flips
+DIRTY_FULL_FLIP_RATIO = 0.35
+# The OS may have lost the window's pixels (uncovered, restored, refocused):
+# the next frame must redraw everything, not just the dirty rects
+SCREEN_EXPOSED_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN,
+                         pygame.WINDOWRESTORED, pygame.WINDOWFOCUSGAINED)
+# Set to gr.CircleSprites(...) to blit circles from pre-rendered sprites in
+# one Surface.blits() batch per frame. Off by default: on software surfaces
+# plain pygame.draw.circle measured faster for solid circles; sprites win
+# once antialias=True, since they rasterize each (radius, color) only once.
+CIRCLE_SPRITES = None
 
 # -------------------- Game Loop -----------------------
 def run_game():
-    global MUSIC_CHANNEL
     # start/loop music and immediately apply current volume
-    MUSIC_CHANNEL = Music_Background.play(loops=-1)
+    APP.music_channel = APP.music.play(loops=-1)
     apply_audio_settings()  # immediately set volume for the live channel
 
-    # Player
-    player = gb.Player(100, 100, 25, 10, (255, 0, 0))
-    player.health = 100
-
-    # Circles
-    num_circles = random.randint(5, 20)
-    circles = [Circle([], player)]
-    for _ in range(1, num_circles):
-        circles.append(Circle(circles, player))
-
-    # Velocities parallel to circles list (respect difficulty)
-    base_speeds = [-5, 5]
-    mult = get_difficulty_speed_multiplier()
-    vels = [[random.choice(base_speeds) * mult, random.choice(base_speeds) * mult] for _ in range(len(circles))]
+    # All simulation state lives in the headless match core
+    # Seeded and recorded, so the run can be replayed and verified later
+    match = gb.Match(speed_mult=get_difficulty_speed_multiplier(), width=WIDTH, height=HEIGHT, record=True)
+    player = match.player
 
-    # Score + timer
-    points = 0
-    start_ticks = pygame.time.get_ticks()
+    # Fixed-timestep clock: the match advances in gb.DT ticks whatever the FPS
+    game_clock = gb.FixedStepClock()
+    dirty = gr.DirtyRenderer(full_ratio=DIRTY_FULL_FLIP_RATIO)
+    last_ticks = pygame.time.get_ticks()
     game_won = False
     final_time_s = None
-    blurred_frame = None
-    is_new_record = False  # set upon win
+    record = None  # Future[glb.RecordResult], set upon win
+
+    # Start opening the leaderboard now so the win frame never waits on it
+    get_leaderboard_service()
 
     while True:
         # ★ change: DO NOT reset MUSIC_CHANNEL here (was breaking volume updates)
         # ---------- Events ----------
         for event in pygame.event.get():
+            if PERF.handle_event(event):
+                continue
             if event.type == pygame.QUIT:
-                if MUSIC_CHANNEL is not None:
-                    MUSIC_CHANNEL.stop()
-                    MUSIC_CHANNEL = None
+                APP.stop_music()
                 return ("menu", None)
+            if event.type in SCREEN_EXPOSED_EVENTS:
+                dirty.invalidate()
             if event.type == pygame.KEYDOWN:
                 if not game_won and event.key == pygame.K_ESCAPE:
-                    Button_Click_sfx.play()
-                    if MUSIC_CHANNEL is not None:
-                        MUSIC_CHANNEL.stop()
-                        MUSIC_CHANNEL = None
+                    APP.click_sfx.play()
+                    APP.stop_music()
                     return ("menu", None)
                 if game_won and event.key in (pygame.K_ESCAPE, pygame.K_RETURN, pygame.K_SPACE):
-                    Button_Click_sfx.play()
-                    if MUSIC_CHANNEL is not None:
-                        MUSIC_CHANNEL.stop()
-                        MUSIC_CHANNEL = None
+                    APP.click_sfx.play()
+                    APP.stop_music()
                     return ("menu", None)
 
         keys = pygame.key.get_pressed()
+        PERF.mark("events")
 
         # ---------- Win Screen ----------
         if game_won:
             # Redraw blurred frame with overlays each tick
-            screen.blit(blurred_frame, (0, 0))
-            title = BIG_FONT.render("Game Won!", True, ACCENT)
-            time_text = FONT.render(f"Your time: {final_time_s:.2f} s", True, WHITE)
-            hint_text = FONT.render("Press ENTER or ESC to return", True, WHITE)
-
-            draw_centered(screen, title, y_offset=-60)
-            draw_centered(screen, time_text, y_offset=0)
-            if is_new_record:
-                nr_text = BIG_FONT.render("New Record!", True, RED)
-                draw_centered(screen, nr_text, y_offset=60)
-            draw_centered(screen, hint_text, y_offset=120)
-
+            APP.screen.blit(OVERLAY_BLUR.step(), (0, 0))
+            title = APP.big_font.render("Game Won!", True, ACCENT)
+            time_text = APP.font.render(f"Your time: {final_time_s:.2f} s", True, WHITE)
+            hint_text = APP.font.render("Press ENTER or ESC to return", True, WHITE)
+
+            draw_centered(APP.screen, title, y_offset=-60)
+            draw_centered(APP.screen, time_text, y_offset=0)
+            # The run is saved in the background; show the banner once it
+            # lands (a failed write just means no banner)
+            if record.done() and record.exception() is None and record.result().is_new:
+                nr_text = APP.big_font.render("New Record!", True, RED)
+                draw_centered(APP.screen, nr_text, y_offset=60)
+            draw_centered(APP.screen, hint_text, y_offset=120)
+
+            PERF.draw(APP.screen)
+            PERF.mark("draw")
             pygame.display.flip()
-            clock.tick(60)
+            PERF.mark("flip")
+            APP.clock.tick(60)
+            PERF.end_frame("game won")
             # (no auto-stop here; it stops when leaving the win screen via keys)
             continue
 
         # ---------- Gameplay ----------
-        # Move player
-        if keys[pygame.K_LEFT]:
-            player.x -= player.move_speed
-        if keys[pygame.K_RIGHT]:
-            player.x += player.move_speed
-        if keys[pygame.K_UP]:
-            player.y -= player.move_speed
-        if keys[pygame.K_DOWN]:
-            player.y += player.move_speed
-
-        # Keep in bounds
-        player.x = max(player.radius, min(player.x, WIDTH - player.radius))
-        player.y = max(player.radius, min(player.y, HEIGHT - player.radius))
-
-        # Move circles + bounce + destroy
-        i = 0
-        while i < len(circles):
-            c = circles[i]
-            vx, vy = vels[i]
-            c.x += vx
-            c.y += vy
-
-            # Wall bounce
-            if c.x - c.r <= 0:
-                c.x = c.r
-                vels[i][0] = -vx
-            elif c.x + c.r >= WIDTH:
-                c.x = WIDTH - c.r
-                vels[i][0] = -vx
-
-            if c.y - c.r <= 0:
-                c.y = c.r
-                vels[i][1] = -vy
-            elif c.y + c.r >= HEIGHT:
-                c.y = HEIGHT - c.r
-                vels[i][1] = -vy
-
-            # Circle-circle bounce (simple)
-            for j in range(i + 1, len(circles)):
-                if c.check_collision(circles[j]):
-                    vels[i][0] = -vels[i][0]
-                    vels[i][1] = -vels[i][1]
-                    vels[j][0] = -vels[j][0]
-                    vels[j][1] = -vels[j][1]
-
-            # destroy on player collision
-            if c.check_collision_player(player):
-                points += 1
-                circles.pop(i)
-                vels.pop(i)
-                Enemy_Kill_sfx.play()
-                continue
+        now = pygame.time.get_ticks()
+        frame_s = (now - last_ticks) / 1000.0
+        last_ticks = now
 
-            i += 1
+        inputs = read_inputs(keys)
+        match.phase_hook = PERF.mark if PERF.enabled else None
+        for _ in range(game_clock.advance(frame_s)):
+            if match.step(inputs):
+                APP.eat_sfx.play()
 
         # ---------- Draw ----------
-        screen.fill(WHITE)
-        for c in circles:
-            c.draw(screen)
-        pygame.draw.circle(screen, player.color, (player.x, player.y), player.radius)
-        draw_name_tag(screen, SETTINGS.get("last_name", "Player"), player.x, player.y, player.radius)
-
-        # HUD
-        elapsed_s = (pygame.time.get_ticks() - start_ticks) / 1000.0
-        points_surf = FONT.render(f"Points: {points}", True, BLACK)
-        timer_surf = FONT.render(f"Time: {elapsed_s:.2f} s", True, BLACK)
-        screen.blit(points_surf, (10, 10))
-        screen.blit(timer_surf, (10, 45))
+        # Only regions touched last frame are cleared; every drawn rect is
+        # recorded so present() can update just those areas.
+        alpha = game_clock.alpha if RENDER_INTERPOLATION and not match.won else 1.0
+        dirty.begin(APP.screen, WHITE)
+        px, py = match.player_pos(alpha)
+        if CIRCLE_SPRITES is not None:
+            dirty.add_all(CIRCLE_SPRITES.draw_all(APP.screen, match.circle_items(alpha)))
+            dirty.add(CIRCLE_SPRITES.blit(APP.screen, px, py, player.radius, player.color))
+        else:
+            for x, y, r, color in match.circle_items(alpha):
+                dirty.add(pygame.draw.circle(APP.screen, color, (x, y), r))
+            dirty.add(pygame.draw.circle(APP.screen, player.color, (px, py), player.radius))
+        dirty.add(draw_name_tag(APP.screen, SETTINGS.get("last_name", "Player"), px, py, player.radius))
+
+        # HUD (simulated time, so it matches the recorded run)
+        elapsed_s = match.elapsed
+        points_label = render_text(APP.font, "Points: ", BLACK)
+        timer_label = render_text(APP.font, "Time: ", BLACK)
+        dirty.add(APP.screen.blit(points_label, (10, 10)))
+        dirty.add(APP.screen.blit(timer_label, (10, 45)))
+        dirty.add(APP.hud_digits.blit(APP.screen, str(match.points), (10 + points_label.get_width(), 10)))
+        dirty.add(APP.hud_digits.blit(APP.screen, f"{elapsed_s:.2f} s", (10 + timer_label.get_width(), 45)))
 
         # Win check -> blur screen, show New Record if applicable, save run
-        if len(circles) == 0 and not game_won:
+        if match.won and not game_won:
             final_time_s = elapsed_s
 
-            # Use stored name automatically
-            name_entered = SETTINGS.get("last_name", "Player")
-
-            # Determine record BEFORE saving (so we compare to previous best)
-            prev = load_leaderboard().get("best_time", None)
-            is_new_record = (prev is None) or (final_time_s < prev - 1e-9)
+            # Save the run with the stored name (off the render thread)
+            record = submit_run(final_time_s, SETTINGS.get("last_name", "Player"), match.replay)
 
-            # Save the run and update best
-            _is_new_confirm, _best_after = add_run_and_check_record(final_time_s, name_entered)
-
-            # Prepare blurred background
-            captured = screen.copy()
-            blurred = blur_surface(captured, factor=10)
-            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            overlay.fill(SHADOW)
-            blurred.blit(overlay, (0, 0))
-            blurred_frame = blurred
+            # Capture the frame; the blur is finished over the next few frames
+            OVERLAY_BLUR.begin(APP.screen, factor=10)
             game_won = True
 
-        pygame.display.flip()
-        clock.tick(60)
+        perf_rect = PERF.draw(APP.screen)
+        if perf_rect is not None:
+            dirty.add(perf_rect)
+        PERF.mark("draw")
+        dirty.present(APP.screen)
+        PERF.mark("flip")
+        APP.clock.tick(60)
+        PERF.end_frame("game")
 
 # -------------------- Leaderboard Screen ----------------
 def leaderboard_screen():
-    global MUSIC_CHANNEL  # ★ change: declare global since we reference it
     back_btn = Button("Back", center=(120, HEIGHT - 50), size=(180, 50))
     clear_btn = Button("Clear All", center=(WIDTH - 140, HEIGHT - 50), size=(200, 50))
-    if MUSIC_CHANNEL is not None:
-        MUSIC_CHANNEL.stop()
-        MUSIC_CHANNEL = None
+    APP.stop_music()
 
     # Layout
     TITLE_Y = 40
@@ -584,35 +619,100 @@ def leaderboard_screen():
     scroll = 0  # top-most visible index
     sort_mode = "recent"  # "recent" or "best"
 
+    # Loaded once; orderings are cached inside the model. If the backend
+    # couldn't be opened, show an empty board with the error instead.
+    try:
+        model = get_leaderboard_model()
+        load_error = None
+    except Exception as e:
+        log.error("leaderboard unavailable: %s", e)
+        model = glb.LeaderboardModel()
+        load_error = f"Leaderboard unavailable: {e}"
+
+    def visible_rows():
+        return min(MAX_VISIBLE_ROWS, max(0, len(model) - scroll))
+
+    # Static layer: title, summary, headers, hint and idle buttons.
+    # Rebuilt when the run count, best time, sort mode or row count changes.
+    def draw_static(surface):
+        total = len(model)
+        best_time = model.best_time
+        title_suffix = "• Sorting: Recent" if sort_mode == "recent" else "• Sorting: Best Times"
+
+        # Title (centered top)
+        title_surf = APP.title_font.render("Leaderboard", True, ACCENT)
+        surface.blit(title_surf, ((WIDTH - title_surf.get_width()) // 2, TITLE_Y))
+
+        # Summary (centered)
+        best_text = "—" if best_time is None else f"{best_time:.2f} s"
+        summary_line = f"Best Time: {best_text}   •   Total Plays: {total}   {title_suffix}"
+        summary_surf = APP.font.render(summary_line, True, BLACK)
+        surface.blit(summary_surf, ((WIDTH - summary_surf.get_width()) // 2, SUMMARY_Y))
+        if load_error is not None:
+            error_surf = APP.small_font.render(load_error, True, RED)
+            surface.blit(error_surf, ((WIDTH - error_surf.get_width()) // 2, SUMMARY_Y + 30))
+
+        # Headers
+        for label, x in (("Rank", COL_RANK_X), ("Name", COL_NAME_X), ("Time (s)", COL_TIME_X), ("Date", COL_DATE_X)):
+            surface.blit(APP.small_font.render(label, True, DARK), (x, TABLE_Y))
+
+        # Horizontal guide line
+        pygame.draw.line(surface, (200, 200, 200), (COL_RANK_X, TABLE_Y + 28), (WIDTH - 80, TABLE_Y + 28), 2)
+
+        # Scroll hint + sort hint, under the last visible row
+        hint_text = "Scroll: Mouse Wheel / Up-Down • Home/End • S to toggle sorting • Enter/Esc to go back"
+        hint = APP.small_font.render(hint_text, True, DARK)
+        surface.blit(hint, (COL_RANK_X, ROW_START_Y + visible_rows() * ROW_H + 8))
+
+        # Buttons
+        back_btn.draw(surface)
+        clear_btn.draw(surface, disabled=(total == 0))
+
+    def static_key():
+        return len(model), model.best_time, sort_mode, visible_rows()
+
+    # Dynamic layer: the visible rows and hovered buttons
+    def draw_dynamic(surface):
+        y = ROW_START_Y
+        for idx, run in enumerate(model.rows(sort_mode, scroll, MAX_VISIBLE_ROWS), start=scroll):
+            rank = idx + 1
+            t = run.get("time", 0.0)
+            d = run.get("date", "")
+            nm = run.get("name", "Player")
+
+            rank_s = APP.mono_font.render(f"{rank}", True, BLACK)
+            name_s = APP.mono_font.render(nm, True, BLACK)
+            time_s = APP.mono_font.render(f"{t:.2f}", True, BLACK)
+            date_s = APP.mono_font.render(d, True, BLACK)
+            surface.blit(rank_s, (COL_RANK_X, y))
+            surface.blit(name_s, (COL_NAME_X, y))
+            surface.blit(time_s, (COL_TIME_X, y))
+            surface.blit(date_s, (COL_DATE_X, y))
+
+            y += ROW_H
+
+        mouse = pygame.mouse.get_pos()
+        if back_btn.is_hover(mouse):
+            back_btn.draw(surface, hovered=True)
+        if clear_btn.is_hover(mouse):
+            clear_btn.draw(surface, hovered=True, disabled=(len(model) == 0))
+
+    scene = gr.Scene(WHITE, draw_static, draw_dynamic, static_key)
+
+    # Redrawn only when something changes; blocks on input while idle
+    sched = gr.RedrawScheduler()
+
     while True:
-        data = load_leaderboard()
-        runs = data.get("runs", [])
-        total = len(runs)
-
-        # Sort runs based on mode
-        if sort_mode == "recent":
-            runs_sorted = sorted(runs, key=lambda r: r.get("date", ""), reverse=True)
-            title_suffix = "• Sorting: Recent"
-        else:
-            runs_sorted = sorted(runs, key=lambda r: r.get("time", float("inf")))
-            title_suffix = "• Sorting: Best Times"
-
-        # Compute best time display (robust)
-        best_time = None
-        if runs:
-            try:
-                best_time = min(r.get("time", float("inf")) for r in runs)
-                if best_time == float("inf"):
-                    best_time = None
-            except Exception:
-                best_time = data.get("best_time", None)
+        total = len(model)
 
-        for event in pygame.event.get():
+        for event in sched.wait():
+            if PERF.handle_event(event):
+                continue
             if event.type == pygame.QUIT:
                 return
             if event.type == pygame.KEYDOWN:
                 if event.key in (pygame.K_ESCAPE, pygame.K_RETURN):
-                    Button_Click_sfx.play()
+                    APP.click_sfx.play()
                     return
                 elif event.key == pygame.K_UP:
                     scroll = max(0, scroll - 1)
@@ -626,88 +726,44 @@ def leaderboard_screen():
                 elif event.key == pygame.K_s:
                     # toggle sort
                     sort_mode = "best" if sort_mode == "recent" else "recent"
-                    Button_Click_sfx.play()
+                    APP.click_sfx.play()
                     scroll = 0
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     mouse = pygame.mouse.get_pos()
                     if back_btn.is_hover(mouse):
-                        Button_Click_sfx.play()
+                        APP.click_sfx.play()
                         return
                     if clear_btn.is_hover(mouse) and total > 0:
-                        Button_Click_sfx.play()
-                        save_leaderboard({"runs": [], "best_time": None})
+                        APP.click_sfx.play()
+                        get_leaderboard_service().clear()
                         scroll = 0
                 elif event.button == 4:  # wheel up
                     scroll = max(0, scroll - 1)
                 elif event.button == 5:  # wheel down
                     max_scroll = max(0, total - MAX_VISIBLE_ROWS)
                     scroll = min(max_scroll, scroll + 1)
+        PERF.mark("events")
 
-        # ----- Draw -----
-        screen.fill(WHITE)
-
-        # Title (centered top)
-        title_surf = TITLE_FONT.render("Leaderboard", True, ACCENT)
-        screen.blit(title_surf, ((WIDTH - title_surf.get_width()) // 2, TITLE_Y))
-
-        # Summary (centered)
-        best_text = "—" if best_time is None else f"{best_time:.2f} s"
-        summary_line = f"Best Time: {best_text}   •   Total Plays: {total}   {title_suffix}"
-        summary_surf = FONT.render(summary_line, True, BLACK)
-        screen.blit(summary_surf, ((WIDTH - summary_surf.get_width()) // 2, SUMMARY_Y))
-
-        # Headers
-        header_rank = SMALL_FONT.render("Rank", True, DARK)
-        header_name = SMALL_FONT.render("Name", True, DARK)
-        header_time = SMALL_FONT.render("Time (s)", True, DARK)
-        header_date = SMALL_FONT.render("Date", True, DARK)
-        screen.blit(header_rank, (COL_RANK_X, TABLE_Y))
-        screen.blit(header_name, (COL_NAME_X, TABLE_Y))
-        screen.blit(header_time, (COL_TIME_X, TABLE_Y))
-        screen.blit(header_date, (COL_DATE_X, TABLE_Y))
-
-        # Horizontal guide line
-        pygame.draw.line(screen, (200, 200, 200), (COL_RANK_X, TABLE_Y + 28), (WIDTH - 80, TABLE_Y + 28), 2)
-
-        # Visible rows
-        start = scroll
-        end = min(total, start + MAX_VISIBLE_ROWS)
-        y = ROW_START_Y
-        for idx in range(start, end):
-            run = runs_sorted[idx]
-            rank = idx + 1
-            t = run.get("time", 0.0)
-            d = run.get("date", "")
-            nm = run.get("name", "Player")
-
-            rank_s = MONO_FONT.render(f"{rank}", True, BLACK)
-            name_s = MONO_FONT.render(nm, True, BLACK)
-            time_s = MONO_FONT.render(f"{t:.2f}", True, BLACK)
-            date_s = MONO_FONT.render(d, True, BLACK)
-            screen.blit(rank_s, (COL_RANK_X, y))
-            screen.blit(name_s, (COL_NAME_X, y))
-            screen.blit(time_s, (COL_TIME_X, y))
-            screen.blit(date_s, (COL_DATE_X, y))
-
-            y += ROW_H
-
-        # Scroll hint + sort hint
-        hint_text = "Scroll: Mouse Wheel / Up-Down • Home/End • S to toggle sorting • Enter/Esc to go back"
-        hint = SMALL_FONT.render(hint_text, True, DARK)
-        screen.blit(hint, (COL_RANK_X, y + 8))
-
-        # Buttons
         mouse = pygame.mouse.get_pos()
-        back_btn.draw(screen, hovered=back_btn.is_hover(mouse))
-        clear_btn.draw(screen, hovered=clear_btn.is_hover(mouse), disabled=(total == 0))
+        sched.track((back_btn.is_hover(mouse), clear_btn.is_hover(mouse)))
+        if not (sched.dirty or PERF.enabled):
+            continue
+
+        # ----- Draw -----
+        scene.draw(APP.screen)
 
+        PERF.draw(APP.screen)
+        PERF.mark("draw")
         pygame.display.flip()
-        clock.tick(60)
+        sched.drawn()
+        PERF.mark("flip")
+        APP.clock.tick(60)
+        PERF.end_frame("leaderboard")
 
 # -------------------- Settings Screen ----------------
 def settings_screen():
-    title_surf = TITLE_FONT.render("Settings", True, ACCENT)
+    title_surf = APP.title_font.render("Settings", True, ACCENT)
 
     # ---- Vertical rhythm (tweak these numbers to taste)
     NAME_Y  = 140
@@ -727,7 +783,7 @@ def settings_screen():
     btn_toggle_full = Button("Toggle Fullscreen", center=(WIDTH // 2, FULL_Y + 36), size=(280, 54))
     btn_diff = Button(f"Difficulty: {SETTINGS.get('difficulty','Normal')}",
                       center=(WIDTH // 2, DIFF_Y), size=(260, 54))
-    diff_hint = SMALL_FONT.render("(Press D to cycle difficulty)", True, DARK)
+    diff_hint = APP.small_font.render("(Press D to cycle difficulty)", True, DARK)
     diff_hint_pos = (WIDTH // 2 - diff_hint.get_width() // 2, DIFF_Y + 32)
 
     # --- Sliders
@@ -744,13 +800,50 @@ def settings_screen():
 
     # Pre-render helpers
     def render_name_label():
-        return FONT.render(f"Name: {SETTINGS.get('last_name','Player')}", True, BLACK)
+        return APP.font.render(f"Name: {SETTINGS.get('last_name','Player')}", True, BLACK)
 
     def render_full_label():
-        return FONT.render(f"Fullscreen: {'On' if SETTINGS.get('fullscreen') else 'Off'}", True, BLACK)
+        return APP.font.render(f"Fullscreen: {'On' if SETTINGS.get('fullscreen') else 'Off'}", True, BLACK)
+
+    buttons = (btn_change_name, btn_toggle_full, btn_diff, btn_reset, btn_back)
+
+    # Static layer: labels, hints and idle buttons. Rebuilt only when the
+    # name, fullscreen or difficulty label changes.
+    def draw_static(surface):
+        draw_centered(surface, title_surf, y_offset=-(HEIGHT // 2 - 60))
+        surface.blit(render_name_label(), (MARGIN_X, NAME_Y))
+        surface.blit(render_full_label(), (MARGIN_X, FULL_Y))
+        surface.blit(diff_hint, diff_hint_pos)
+        surface.blit(APP.font.render("Master Volume", True, BLACK), master_label_pos)
+        surface.blit(APP.font.render("SFX Volume", True, BLACK), sfx_label_pos)
+        for b in buttons:
+            b.draw(surface)
+        footer = APP.small_font.render("Esc/Enter = Back  •  F = Toggle Fullscreen  •  D = Cycle Difficulty", True, DARK)
+        surface.blit(footer, (WIDTH // 2 - footer.get_width() // 2, HEIGHT - 26 - footer.get_height()))
+
+    def static_key():
+        return SETTINGS.get("last_name"), SETTINGS.get("fullscreen"), btn_diff.text
+
+    # Dynamic layer: sliders with their percentages, hovered buttons
+    def draw_dynamic(surface):
+        for slider in (master_slider, sfx_slider):
+            slider.draw(surface)
+            pct = render_text(APP.small_font, f"{int(slider.value * 100)}%", DARK)
+            surface.blit(pct, (slider.track_rect.right + 12, slider.track_rect.y - 8))
+        mouse = pygame.mouse.get_pos()
+        for b in buttons:
+            if b.is_hover(mouse):
+                b.draw(surface, hovered=True)
+
+    scene = gr.Scene(WHITE, draw_static, draw_dynamic, static_key)
+
+    # Redrawn only when something changes; blocks on input while idle
+    sched = gr.RedrawScheduler()
 
     while True:
-        for event in pygame.event.get():
+        for event in sched.wait():
+            if PERF.handle_event(event):
+                continue
             if event.type == pygame.QUIT:
                 return
 
@@ -767,24 +860,24 @@ def settings_screen():
 
             if event.type == pygame.KEYDOWN:
                 if event.key in (pygame.K_ESCAPE, pygame.K_RETURN):
-                    Button_Click_sfx.play()
+                    APP.click_sfx.play()
                     return
                 if event.key == pygame.K_f:
                     SETTINGS["fullscreen"] = not SETTINGS.get("fullscreen", False)
                     save_settings(SETTINGS)
                     apply_display_settings()
-                    Button_Click_sfx.play()
+                    APP.click_sfx.play()
                 if event.key == pygame.K_d:
                     SETTINGS["difficulty"] = next_difficulty(SETTINGS.get("difficulty", "Normal"))
                     btn_diff.text = f"Difficulty: {SETTINGS['difficulty']}"
                     save_settings(SETTINGS)
-                    Button_Click_sfx.play()
+                    APP.click_sfx.play()
 
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 mx, my = pygame.mouse.get_pos()
 
                 if btn_change_name.is_hover((mx, my)):
-                    Button_Click_sfx.play()
+                    APP.click_sfx.play()
                     new_name = text_input_dialog("Enter your display name:", SETTINGS.get("last_name", "Player"))
                     SETTINGS["last_name"] = new_name
                     save_settings(SETTINGS)
@@ -793,13 +886,13 @@ def settings_screen():
                     SETTINGS["fullscreen"] = not SETTINGS.get("fullscreen", False)
                     save_settings(SETTINGS)
                     apply_display_settings()
-                    Button_Click_sfx.play()
+                    APP.click_sfx.play()
 
                 elif btn_diff.is_hover((mx, my)):
                     SETTINGS["difficulty"] = next_difficulty(SETTINGS.get("difficulty", "Normal"))
                     btn_diff.text = f"Difficulty: {SETTINGS['difficulty']}"
                     save_settings(SETTINGS)
-                    Button_Click_sfx.play()
+                    APP.click_sfx.play()
 
                 elif btn_reset.is_hover((mx, my)):
                     SETTINGS.update(DEFAULT_SETTINGS)
@@ -809,51 +902,29 @@ def settings_screen():
                     master_slider.value = SETTINGS["master_volume"]
                     sfx_slider.value = SETTINGS["sfx_volume"]
                     apply_all_settings()
-                    Button_Click_sfx.play()
+                    APP.click_sfx.play()
 
                 elif btn_back.is_hover((mx, my)):
-                    Button_Click_sfx.play()
+                    APP.click_sfx.play()
                     return
 
+        PERF.mark("events")
+
+        mouse = pygame.mouse.get_pos()
+        sched.track((tuple(b.is_hover(mouse) for b in buttons), master_slider.value, sfx_slider.value))
+        if not (sched.dirty or PERF.enabled):
+            continue
+
         # ---- Draw ----
-        screen.fill(WHITE)
-        # Title
-        draw_centered(screen, title_surf, y_offset=-(HEIGHT // 2 - 60))
-
-        # Row: Name
-        screen.blit(render_name_label(), (MARGIN_X, NAME_Y))
-        btn_change_name.draw(screen, hovered=btn_change_name.is_hover(pygame.mouse.get_pos()))
-
-        # Row: Fullscreen
-        screen.blit(render_full_label(), (MARGIN_X, FULL_Y))
-        btn_toggle_full.draw(screen, hovered=btn_toggle_full.is_hover(pygame.mouse.get_pos()))
-
-        # Row: Difficulty + hint
-        btn_diff.draw(screen, hovered=btn_diff.is_hover(pygame.mouse.get_pos()))
-        screen.blit(diff_hint, diff_hint_pos)
-
-        # Row: Master Volume
-        screen.blit(FONT.render("Master Volume", True, BLACK), master_label_pos)
-        master_slider.draw(screen)
-        mv_txt = SMALL_FONT.render(f"{int(master_slider.value * 100)}%", True, DARK)
-        screen.blit(mv_txt, (master_slider.track_rect.right + 12, master_slider.track_rect.y - 8))
-
-        # Row: SFX Volume
-        screen.blit(FONT.render("SFX Volume", True, BLACK), sfx_label_pos)
-        sfx_slider.draw(screen)
-        sv_txt = SMALL_FONT.render(f"{int(sfx_slider.value * 100)}%", True, DARK)
-        screen.blit(sv_txt, (sfx_slider.track_rect.right + 12, sfx_slider.track_rect.y - 8))
-
-        # Bottom buttons
-        btn_reset.draw(screen, hovered=btn_reset.is_hover(pygame.mouse.get_pos()))
-        btn_back.draw(screen, hovered=btn_back.is_hover(pygame.mouse.get_pos()))
-
-        # Footer hint
-        footer = SMALL_FONT.render("Esc/Enter = Back  •  F = Toggle Fullscreen  •  D = Cycle Difficulty", True, DARK)
-        screen.blit(footer, (WIDTH // 2 - footer.get_width() // 2, HEIGHT - 26 - footer.get_height()))
+        scene.draw(APP.screen)
 
+        PERF.draw(APP.screen)
+        PERF.mark("draw")
         pygame.display.flip()
-        clock.tick(60)
+        sched.drawn()
+        PERF.mark("flip")
+        APP.clock.tick(60)
+        PERF.end_frame("settings")
 
 
 def next_difficulty(cur):
@@ -866,83 +937,97 @@ def next_difficulty(cur):
 
 # -------------------- Main Menu -----------------------
 def main_menu():
-    global MUSIC_CHANNEL
-    title = TITLE_FONT.render("Circle Eater", True, ACCENT)
-    subtitle = FONT.render("Eat all circles as fast as you can!", True, BLACK)
+    title = APP.title_font.render("Circle Eater", True, ACCENT)
+    subtitle = APP.font.render("Eat all circles as fast as you can!", True, BLACK)
 
     btn_play = Button("Play", center=(WIDTH // 2, HEIGHT // 2))
     btn_leader = Button("Leaderboard", center=(WIDTH // 2, HEIGHT // 2 + 90), size=(260, 64))
     btn_settings = Button("Settings", center=(WIDTH // 2, HEIGHT // 2 + 180), size=(220, 64))
     btn_quit = Button("Quit", center=(WIDTH // 2, HEIGHT // 2 + 270))
-    
+    buttons = (btn_play, btn_leader, btn_settings, btn_quit)
+
+    # Static layer: texts and idle buttons; hovered ones are drawn over it
+    def draw_static(surface):
+        draw_centered(surface, title, y_offset=-180)
+        draw_centered(surface, subtitle, y_offset=-130)
+        for b in buttons:
+            b.draw(surface)
+        hint = APP.font.render("ENTER/SPACE = Play   •   L = Leaderboard   •   S = Settings   •   ESC = Quit", True, DARK)
+        draw_centered(surface, hint, y_offset=360)
+
+    def draw_dynamic(surface):
+        mouse = pygame.mouse.get_pos()
+        for b in buttons:
+            if b.is_hover(mouse):
+                b.draw(surface, hovered=True)
+
+    scene = gr.Scene(WHITE, draw_static, draw_dynamic)
+
+    # Redrawn only when something changes; blocks on input while idle
+    sched = gr.RedrawScheduler()
+
     while True:
-        for event in pygame.event.get():
+        for event in sched.wait():
+            if PERF.handle_event(event):
+                continue
             if event.type == pygame.QUIT:
                 return "quit"
             if event.type == pygame.KEYDOWN:
                 if event.key in (pygame.K_RETURN, pygame.K_SPACE):
-                    Button_Click_sfx.play()
+                    APP.click_sfx.play()
                     return "play"
                 if event.key == pygame.K_ESCAPE:
-                    if MUSIC_CHANNEL is not None:
-                        MUSIC_CHANNEL.stop()
-                        MUSIC_CHANNEL = None
-                    Button_Click_sfx.play()
+                    APP.stop_music()
+                    APP.click_sfx.play()
                     return "quit"
                 if event.key == pygame.K_l:
-                    Button_Click_sfx.play()
-                    if MUSIC_CHANNEL is not None:
-                        MUSIC_CHANNEL.stop()
-                        MUSIC_CHANNEL = None
+                    APP.click_sfx.play()
+                    APP.stop_music()
                     return "leaderboard"
                 if event.key == pygame.K_s:
-                    Button_Click_sfx.play()
-                    if MUSIC_CHANNEL is not None:
-                        MUSIC_CHANNEL.stop()
-                        MUSIC_CHANNEL = None
+                    APP.click_sfx.play()
+                    APP.stop_music()
                     return "settings"
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 if btn_play.is_hover(pygame.mouse.get_pos()):
-                    Button_Click_sfx.play()
+                    APP.click_sfx.play()
                     return "play"
                 if btn_leader.is_hover(pygame.mouse.get_pos()):
-                    Button_Click_sfx.play()
-                    if MUSIC_CHANNEL is not None:
-                        MUSIC_CHANNEL.stop()
-                        MUSIC_CHANNEL = None
+                    APP.click_sfx.play()
+                    APP.stop_music()
                     return "leaderboard"
                 if btn_settings.is_hover(pygame.mouse.get_pos()):
-                    Button_Click_sfx.play()
-                    if MUSIC_CHANNEL is not None:
-                        MUSIC_CHANNEL.stop()
-                        MUSIC_CHANNEL = None
+                    APP.click_sfx.play()
+                    APP.stop_music()
                     return "settings"
                 if btn_quit.is_hover(pygame.mouse.get_pos()):
-                    Button_Click_sfx.play()
-                    if MUSIC_CHANNEL is not None:
-                        MUSIC_CHANNEL.stop()
-                        MUSIC_CHANNEL = None
+                    APP.click_sfx.play()
+                    APP.stop_music()
                     return "quit"
 
-        # Draw menu
-        screen.fill(WHITE)
-        draw_centered(screen, title, y_offset=-180)
-        draw_centered(screen, subtitle, y_offset=-130)
+        PERF.mark("events")
 
         mouse = pygame.mouse.get_pos()
-        btn_play.draw(screen, hovered=btn_play.is_hover(mouse))
-        btn_leader.draw(screen, hovered=btn_leader.is_hover(mouse))
-        btn_settings.draw(screen, hovered=btn_settings.is_hover(mouse))
-        btn_quit.draw(screen, hovered=btn_quit.is_hover(mouse))
+        sched.track(tuple(b.is_hover(mouse) for b in buttons))
+        if not (sched.dirty or PERF.enabled):
+            continue
 
-        hint = FONT.render("ENTER/SPACE = Play   •   L = Leaderboard   •   S = Settings   •   ESC = Quit", True, DARK)
-        draw_centered(screen, hint, y_offset=360)
+        # Draw menu
+        scene.draw(APP.screen)
 
+        PERF.draw(APP.screen)
+        PERF.mark("draw")
         pygame.display.flip()
-        clock.tick(60)
+        sched.drawn()
+        PERF.mark("flip")
+        APP.clock.tick(60)
+        PERF.end_frame("menu")
 
 # -------------------- Running Loop ------------------------
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(name)s: %(message)s")
+    if APP is None:
+        init_app()
     while True:
         choice = main_menu()
         if choice == "quit":
@@ -957,6 +1042,14 @@ def main():
             run_game()
             continue
 
+    # Let pending settings and queued leaderboard writes finish before exiting;
+    # runs the online leaderboard hasn't taken yet stay in the outbox
+    PERF.stop_trace()
+    SETTINGS_WRITER.close()
+    if LEADERBOARD_SERVICE is not None:
+        LEADERBOARD_SERVICE.shutdown()
+    if ONLINE_SYNC is not None:
+        ONLINE_SYNC.close(timeout=2.0)
     pygame.quit()
 
 # Start
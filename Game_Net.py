@@ -0,0 +1,531 @@
+"""
+Authoritative multiplayer room server (asyncio, TCP) and loopback client.
+
+Every room is a RoomMatch: the normal Match simulation with several
+players, stepped by the server at the fixed TICK_RATE. Clients only send
+their INPUT_* bits; the server sends back snapshots of the room.
+
+Snapshots are quantized (positions in 1/QUANT px, 16-bit) and
+delta-compressed against the last snapshot each client acknowledged:
+circles that did not move are left out, small moves are sent as 8-bit
+offsets, eaten circles as their id. A client that falls too far behind
+gets a full snapshot. Worst case per snapshot is bounded by
+MAX_PLAYERS and the circle count, and a slow client's snapshots are
+skipped rather than queued.
+
+    python Game_Net.py --rooms 200 --seconds 10     # server + loopback bots
+    python Game_Net.py --serve --port 7777          # server only
+"""
+import argparse
+import asyncio
+import logging
+import random
+import struct
+import time
+from collections import OrderedDict
+
+import Game_Backend as gb
+
+log = logging.getLogger(__name__)
+
+QUANT = 4                 # position quanta per pixel
+SNAPSHOT_EVERY = 2        # ticks between snapshots (30 Hz at 60 ticks/s)
+HISTORY = 32              # snapshots kept per room as delta baselines
+MAX_PLAYERS = 8
+MAX_BUFFERED = 64 * 1024  # skip snapshots while a client's send buffer is this full
+NO_BASE = 0xFFFFFFFF
+
+# Message types
+MSG_JOIN = 1       # C->S  room name, player name
+MSG_WELCOME = 2    # S->C  player id, tick rate, arena size
+MSG_ROUND = 3      # S->C  round number + static circle table (id, r, color)
+MSG_SNAPSHOT = 4   # S->C  tick, baseline tick, players, circle changes
+MSG_INPUT = 5      # C->S  last snapshot tick received, input bits
+
+_HDR = struct.Struct("!H")
+_WELCOME = struct.Struct("!BBBHH")
+_ROUND_HEAD = struct.Struct("!BHH")
+_ROUND_ITEM = struct.Struct("!HBBBB")
+_SNAP_HEAD = struct.Struct("!BHIIBHH")
+_SNAP_PLAYER = struct.Struct("!BHHH")
+_ABS = struct.Struct("!HHH")
+_DELTA = struct.Struct("!Hbb")
+_INPUT = struct.Struct("!BIB")
+
+
+def quantize(v):
+    return int(v * QUANT + 0.5)
+
+
+# -------------------- Room simulation -----------------
+class RoomMatch(gb.Match):
+    """
+    A Match shared by several players. Each tick moves every player by
+    its latest input, then runs the usual circle pass; a circle touching
+    a player is eaten and scored to them. A round ends when all circles
+    are eaten.
+    """
+    def __init__(self, num_circles=None, speed_mult=1.0, seed=None,
+                 width=gb.ARENA_WIDTH, height=gb.ARENA_HEIGHT):
+        super().__init__(num_circles, speed_mult, width=width, height=height,
+                         array_engine=False, seed=seed)
+        # Circle ids are their spawn index; stable for the whole round
+        self.ids = {id(c): i for i, c in enumerate(self.circles)}
+        self.players = {}   # player id -> gb.Player
+        self.scores = {}    # player id -> circles eaten
+        self.inputs = {}    # player id -> latest INPUT_* bits
+
+    def add_player(self, pid):
+        template = self.player
+        self.players[pid] = gb.Player(template.x, template.y, template.radius,
+                                      template.move_speed, template.color)
+        self.scores.setdefault(pid, 0)
+        self.inputs[pid] = 0
+
+    def remove_player(self, pid):
+        self.players.pop(pid, None)
+        self.inputs.pop(pid, None)
+
+    def step(self, inputs=0):
+        if self.won:
+            return 0
+        order = sorted(self.players)
+        for pid in order:
+            self._move_player(self.inputs.get(pid, 0), self.players[pid])
+        eaten = self._step_circles([self.players[pid] for pid in order])
+        for pid, n in zip(order, eaten):
+            self.scores[pid] += n
+        total = sum(eaten)
+        self.points += total
+        self.ticks += 1
+        if not self.circles:
+            self.won = True
+        return total
+
+    def quantized(self):
+        """{circle id: (qx, qy)} for the current tick."""
+        ids = self.ids
+        return {ids[id(c)]: (quantize(c.x), quantize(c.y)) for c in self.circles}
+
+
+# -------------------- Snapshot codec ------------------
+def encode_snapshot(round_no, tick, state, players, base_tick=None, base=None):
+    """Pack one snapshot; `base` is the state at base_tick the client has."""
+    parts = []
+    removed = []
+    if base is None:
+        base_tick = NO_BASE
+        for cid, (qx, qy) in state.items():
+            parts.append(_ABS.pack(cid, qx, qy))
+    else:
+        for cid, (qx, qy) in state.items():
+            old = base.get(cid)
+            if old is None:
+                parts.append(_ABS.pack(cid, qx, qy))
+                continue
+            dx, dy = qx - old[0], qy - old[1]
+            if dx == 0 and dy == 0:
+                continue
+            if -128 <= dx < 128 and -128 <= dy < 128:
+                parts.append(_DELTA.pack(cid | 0x8000, dx, dy))
+            else:
+                parts.append(_ABS.pack(cid, qx, qy))
+        removed = [cid for cid in base if cid not in state]
+    head = _SNAP_HEAD.pack(MSG_SNAPSHOT, round_no, tick, base_tick, len(players), len(parts), len(removed))
+    body = b"".join(_SNAP_PLAYER.pack(pid, qx, qy, min(score, 0xFFFF)) for pid, qx, qy, score in players)
+    return head + body + b"".join(parts) + struct.pack(f"!{len(removed)}H", *removed)
+
+
+def decode_snapshot(data, baselines):
+    """Unpack a snapshot against the client's stored states.
+    Returns (round, tick, state, players) or None if the baseline is gone."""
+    _, round_no, tick, base_tick, n_players, n_changed, n_removed = _SNAP_HEAD.unpack_from(data)
+    off = _SNAP_HEAD.size
+    players = []
+    for _ in range(n_players):
+        players.append(_SNAP_PLAYER.unpack_from(data, off))
+        off += _SNAP_PLAYER.size
+    if base_tick == NO_BASE:
+        state = {}
+    else:
+        base = baselines.get(base_tick)
+        if base is None:
+            return None
+        state = dict(base)
+    for _ in range(n_changed):
+        (cid,) = _HDR.unpack_from(data, off)
+        if cid & 0x8000:
+            cid, dx, dy = _DELTA.unpack_from(data, off)
+            cid &= 0x7FFF
+            qx, qy = state[cid]
+            state[cid] = (qx + dx, qy + dy)
+            off += _DELTA.size
+        else:
+            _, qx, qy = _ABS.unpack_from(data, off)
+            state[cid] = (qx, qy)
+            off += _ABS.size
+    for cid in struct.unpack_from(f"!{n_removed}H", data, off):
+        state.pop(cid, None)
+    return round_no, tick, state, players
+
+
+def encode_round(round_no, match):
+    items = [_ROUND_ITEM.pack(match.ids[id(c)], c.r, *c.color) for c in match.circles]
+    return _ROUND_HEAD.pack(MSG_ROUND, round_no, len(items)) + b"".join(items)
+
+
+async def read_message(reader):
+    (size,) = _HDR.unpack(await reader.readexactly(_HDR.size))
+    return await reader.readexactly(size)
+
+
+def frame(payload):
+    return _HDR.pack(len(payload)) + payload
+
+
+def parse_join(data):
+    """(room name, player name) from a JOIN message; ValueError if it is
+    malformed (wrong type, lengths that don't match, bad UTF-8)."""
+    if len(data) < 3 or data[0] != MSG_JOIN:
+        raise ValueError("not a JOIN message")
+    end = 2 + data[1]
+    if data[1] == 0 or len(data) < end + 1 or len(data) != end + 1 + data[end]:
+        raise ValueError("JOIN lengths don't match the payload")
+    return data[2:end].decode("utf-8"), data[end + 1:].decode("utf-8")
+
+
+def parse_input(data):
+    """(acked tick or None, input bits) from an INPUT message."""
+    if len(data) != _INPUT.size or data[0] != MSG_INPUT:
+        raise ValueError("not an INPUT message")
+    _, ack, bits = _INPUT.unpack(data)
+    return (None if ack == NO_BASE else ack), bits & 0x0F
+
+
+# -------------------- Server --------------------------
+class Client:
+    def __init__(self, pid, writer):
+        self.pid = pid
+        self.writer = writer
+        self.ack = None          # last snapshot tick the client confirmed
+        self.bytes_sent = 0
+        self.snapshots = 0
+        self.skipped = 0
+
+    def send(self, payload):
+        data = frame(payload)
+        self.writer.write(data)
+        self.bytes_sent += len(data)
+
+
+class Room:
+    def __init__(self, name, rng, num_circles=None, speed_mult=1.0):
+        self.name = name
+        self.rng = rng
+        self.num_circles = num_circles
+        self.speed_mult = speed_mult
+        self.clients = {}
+        self.round = 0
+        self.tick = 0
+        self.history = OrderedDict()   # snapshot tick -> quantized state
+        self.new_round()
+
+    def new_round(self):
+        self.round = (self.round + 1) & 0xFFFF
+        self.match = RoomMatch(self.num_circles, self.speed_mult, seed=self.rng.getrandbits(32))
+        self.history.clear()
+        for c in self.clients.values():
+            self.match.add_player(c.pid)
+            c.ack = None
+        message = encode_round(self.round, self.match)
+        for c in self.clients.values():
+            c.send(message)
+
+    def free_id(self):
+        return next(i for i in range(MAX_PLAYERS) if i not in self.clients)
+
+    def join(self, client):
+        self.clients[client.pid] = client
+        self.match.add_player(client.pid)
+        client.send(encode_round(self.round, self.match))
+
+    def leave(self, pid):
+        self.clients.pop(pid, None)
+        self.match.remove_player(pid)
+
+    def step(self):
+        self.match.step()
+        self.tick += 1
+        if self.match.won:
+            self.new_round()
+            return
+        if self.tick % SNAPSHOT_EVERY:
+            return
+
+        state = self.match.quantized()
+        self.history[self.tick] = state
+        if len(self.history) > HISTORY:
+            self.history.popitem(last=False)
+        m = self.match
+        players = [(pid, quantize(p.x), quantize(p.y), m.scores[pid]) for pid, p in sorted(m.players.items())]
+
+        # Clients acking the same baseline share one encoded snapshot
+        encoded = {}
+        for c in self.clients.values():
+            if c.writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+                c.skipped += 1
+                continue
+            base_tick = c.ack if c.ack in self.history else None
+            msg = encoded.get(base_tick)
+            if msg is None:
+                base = self.history[base_tick] if base_tick is not None else None
+                msg = encoded[base_tick] = encode_snapshot(self.round, self.tick, state, players, base_tick, base)
+            c.send(msg)
+            c.snapshots += 1
+
+
+class RoomServer:
+    """
+    Hosts any number of rooms in one asyncio loop. A single ticker steps
+    every room at TICK_RATE (no per-room timers), so rooms per core are
+    bounded by simulation cost, not scheduling.
+    """
+    def __init__(self, num_circles=None, speed_mult=1.0, seed=None):
+        self.rooms = {}
+        self.num_circles = num_circles
+        self.speed_mult = speed_mult
+        self.rng = random.Random(seed)
+        self.ticks = 0
+        self.tick_seconds = 0.0
+        self.late_ticks = 0
+        self.dropped_rooms = 0
+        self._server = None
+        self._ticker = None
+        self._handlers = set()
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self._ticker = asyncio.ensure_future(self._tick_loop())
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._ticker.cancel()
+        self._server.close()
+        for task in self._handlers:
+            task.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _tick_loop(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            t0 = time.perf_counter()
+            for room in list(self.rooms.values()):
+                try:
+                    room.step()
+                except Exception:
+                    # One broken room must not freeze the others
+                    log.exception("room %r failed; closing it", room.name)
+                    self._drop_room(room)
+            self.tick_seconds += time.perf_counter() - t0
+            self.ticks += 1
+            next_tick += gb.DT
+            delay = next_tick - loop.time()
+            if delay < 0:
+                self.late_ticks += 1
+                next_tick = loop.time()   # don't try to catch up in a burst
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def _drop_room(self, room):
+        self.dropped_rooms += 1
+        if self.rooms.get(room.name) is room:
+            del self.rooms[room.name]
+        for client in room.clients.values():
+            client.writer.close()   # its handler then ends and cleans up
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        room = client = None
+        try:
+            room_name, _ = parse_join(await read_message(reader))
+            room = self.rooms.get(room_name)
+            if room is None:
+                room = self.rooms[room_name] = Room(room_name, random.Random(self.rng.getrandbits(32)),
+                                                    self.num_circles, self.speed_mult)
+            if len(room.clients) >= MAX_PLAYERS:
+                return
+            client = Client(room.free_id(), writer)
+            m = room.match
+            client.send(_WELCOME.pack(MSG_WELCOME, client.pid, gb.TICK_RATE, m.width, m.height))
+            room.join(client)
+
+            while True:
+                ack, bits = parse_input(await read_message(reader))
+                client.ack = ack
+                room.match.inputs[client.pid] = bits
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except (ValueError, IndexError, struct.error):
+            pass   # malformed message: drop just this client
+        except asyncio.CancelledError:
+            pass   # server shutting down
+        finally:
+            self._handlers.discard(task)
+            if room is not None and client is not None:
+                room.leave(client.pid)
+                if not room.clients and self.rooms.get(room.name) is room:
+                    del self.rooms[room.name]
+            writer.close()
+
+
+# -------------------- Loopback client -----------------
+class LoopbackClient:
+    """
+    Minimal client: joins a room, rebuilds the room state from snapshots
+    and sends an input (plus ack) for every snapshot it applies.
+    policy(client) returns INPUT_* bits.
+    """
+    def __init__(self, room, name="bot", policy=None):
+        self.room = room
+        self.name = name
+        self.policy = policy or (lambda client: 0)
+        self.pid = None
+        self.round = None
+        self.circles = {}      # id -> (r, color) from the round table
+        self.states = OrderedDict()
+        self.state = {}
+        self.tick = None
+        self.players = []
+        self.bytes_received = 0
+        self.full_snapshots = 0
+        self.delta_snapshots = 0
+        self.missing_base = 0
+
+    async def run(self, host, port, seconds):
+        reader, writer = await asyncio.open_connection(host, port)
+        room = self.room.encode("utf-8")
+        name = self.name.encode("utf-8")
+        writer.write(frame(bytes([MSG_JOIN, len(room)]) + room + bytes([len(name)]) + name))
+        deadline = time.perf_counter() + seconds
+        try:
+            while time.perf_counter() < deadline:
+                try:
+                    data = await asyncio.wait_for(read_message(reader), timeout=1.0)
+                except asyncio.TimeoutError:
+                    continue
+                self.bytes_received += len(data) + _HDR.size
+                self._apply(data)
+                if data[0] == MSG_SNAPSHOT:
+                    ack = self.tick if self.tick is not None else NO_BASE
+                    writer.write(frame(_INPUT.pack(MSG_INPUT, ack, self.policy(self))))
+        finally:
+            writer.close()
+
+    def _apply(self, data):
+        kind = data[0]
+        if kind == MSG_WELCOME:
+            _, self.pid, _, _, _ = _WELCOME.unpack(data)
+        elif kind == MSG_ROUND:
+            _, self.round, n = _ROUND_HEAD.unpack_from(data)
+            self.circles = {}
+            for i in range(n):
+                cid, r, *color = _ROUND_ITEM.unpack_from(data, _ROUND_HEAD.size + i * _ROUND_ITEM.size)
+                self.circles[cid] = (r, tuple(color))
+            self.states.clear()
+            self.state, self.tick = {}, None
+        elif kind == MSG_SNAPSHOT:
+            decoded = decode_snapshot(data, self.states)
+            if decoded is None:
+                self.missing_base += 1
+                return
+            round_no, tick, state, players = decoded
+            if round_no != self.round:
+                return
+            if _SNAP_HEAD.unpack_from(data)[3] == NO_BASE:
+                self.full_snapshots += 1
+            else:
+                self.delta_snapshots += 1
+            self.state, self.tick, self.players = state, tick, players
+            self.states[tick] = state
+            while len(self.states) > HISTORY:
+                self.states.popitem(last=False)
+
+    def circle_items(self):
+        """(x, y, r, color) of every circle, for drawing."""
+        return [(qx / QUANT, qy / QUANT, *self.circles[cid]) for cid, (qx, qy) in self.state.items()]
+
+
+def chase_policy(client):
+    """Bot input: steer at the nearest circle in the client's view."""
+    me = next((p for p in client.players if p[0] == client.pid), None)
+    if me is None or not client.state:
+        return 0
+    _, px, py, _ = me
+    tx, ty = min(client.state.values(), key=lambda q: (q[0] - px) ** 2 + (q[1] - py) ** 2)
+    step = 5 * QUANT
+    bits = 0
+    if tx < px - step:
+        bits |= gb.INPUT_LEFT
+    elif tx > px + step:
+        bits |= gb.INPUT_RIGHT
+    if ty < py - step:
+        bits |= gb.INPUT_UP
+    elif ty > py + step:
+        bits |= gb.INPUT_DOWN
+    return bits
+
+
+# -------------------- Loopback test -------------------
+async def loopback(rooms, per_room, seconds, num_circles):
+    server = RoomServer(num_circles=num_circles, seed=1)
+    port = await server.start()
+    clients = [LoopbackClient(f"room{r}", f"bot{k}", chase_policy) for r in range(rooms) for k in range(per_room)]
+    await asyncio.gather(*(c.run("127.0.0.1", port, seconds) for c in clients))
+
+    # Every client's latest view must equal the server's state at that tick
+    mismatched = 0
+    for c in clients:
+        room = server.rooms.get(c.room)
+        if room is not None and c.round == room.round and c.tick in room.history:
+            mismatched += room.history[c.tick] != c.state
+    await server.stop()
+
+    received = sum(c.bytes_received for c in clients)
+    full = sum(c.full_snapshots for c in clients)
+    delta = sum(c.delta_snapshots for c in clients)
+    print(f"{rooms} rooms x {per_room} clients for {seconds:.0f} s: "
+          f"{server.ticks} ticks ({server.ticks / seconds:.1f}/s, {server.late_ticks} late), "
+          f"sim+encode {server.tick_seconds / max(1, server.ticks) * 1000:.2f} ms/tick")
+    print(f"snapshots: {delta} delta, {full} full; "
+          f"{received / len(clients) / seconds / 1024:.1f} KiB/s per client; "
+          f"{mismatched} client views differ from the server")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Circle Eater room server")
+    ap.add_argument("--serve", action="store_true", help="run the server only")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=7777)
+    ap.add_argument("--rooms", type=int, default=50, help="loopback test: rooms")
+    ap.add_argument("--clients", type=int, default=2, help="loopback test: clients per room")
+    ap.add_argument("--seconds", type=float, default=5.0, help="loopback test: duration")
+    ap.add_argument("--circles", type=int, default=None, help="circles per round (default: 5-20)")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(name)s: %(message)s")
+
+    if args.serve:
+        async def serve():
+            server = RoomServer(num_circles=args.circles)
+            port = await server.start(args.host, args.port)
+            print(f"serving on {args.host}:{port}")
+            await asyncio.Event().wait()
+        asyncio.run(serve())
+    else:
+        asyncio.run(loopback(args.rooms, args.clients, args.seconds, args.circles))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,525 @@
+"""
+Online leaderboard: a sync client for the game and a local stand-in server.
+
+The game hands finished runs to LeaderboardSync.submit(), which only
+appends to an in-memory queue. A background thread uploads the queue in
+batches over one kept-alive HTTP connection. If the server cannot be
+reached it retries with exponential backoff. Runs not yet accepted are
+kept in an outbox file, so they survive a restart. Top-N pages are
+fetched with If-None-Match, and an unchanged page costs a 304.
+
+StandInServer speaks the same protocol from memory, for tests and local
+play:
+
+    python Game_Online.py --serve --port 8765     # stand-in server only
+    python Game_Online.py --runs 1000 --fail 2    # sync demo against it
+
+Protocol (JSON bodies):
+    POST /runs   {"runs": [{"id", "time", "date", "name"}, ...]}
+                 -> {"accepted": n, "duplicates": n}
+    GET  /top?mode=best|recent&start=0&count=10
+                 -> {"rows": [...], "total": n}   (ETag; 304 if unchanged)
+Run ids are assigned by the client, so a batch retried after a lost
+response is not counted twice.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque, namedtuple
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import Game_Leaderboard as glb
+
+BATCH_SIZE = 500        # runs per upload request
+MAX_BATCH = 1000        # the server refuses larger batches
+MAX_BODY = 1 << 20      # bytes
+
+Page = namedtuple("Page", ["rows", "total", "stale"])
+
+
+# -------------------- Sync client ---------------------
+class LeaderboardSync:
+    """
+    Uploads runs and fetches top pages on one background thread.
+    Nothing here blocks the caller: submit() queues a run, top() returns
+    a Future. Runs go out `batch_size` at a time, once `linger` seconds
+    have passed since the first one was queued (or at once when a full
+    batch is waiting). Failed uploads are retried with backoff between
+    `backoff` seconds and `max_backoff` seconds. A batch the server
+    rejects outright (4xx) is dropped so it cannot block the queue.
+    """
+    def __init__(self, url, outbox_path=None, batch_size=BATCH_SIZE, linger=1.0,
+                 timeout=5.0, backoff=0.5, max_backoff=60.0):
+        parts = urlsplit(url)
+        self._conn_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._host = parts.netloc
+        self._base = parts.path.rstrip("/")
+        self.outbox_path = outbox_path
+        self.batch_size = batch_size
+        self.linger = linger
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._cond = threading.Condition()
+        self._queue = deque()       # runs not yet accepted, oldest first
+        self._fetches = deque()     # (Future, mode, start, count)
+        self._first_at = None       # when the oldest queued run arrived
+        self._retry_at = 0.0
+        self._failures = 0
+        self._flushing = 0
+        self._outbox_dirty = False
+        self._outbox_lock = threading.Lock()
+        self._closed = False
+        self._conn = None
+        self._pages = {}            # (mode, start, count) -> (etag, Page)
+
+        self.requests = 0
+        self.sent = 0
+        self.rejected = 0
+        self.retries = 0
+        self.not_modified = 0
+        self.errors = 0         # unreadable responses, outbox write failures
+
+        self._thread = threading.Thread(target=self._run, name="leaderboard-sync", daemon=True)
+        self._thread.start()
+
+    # ----- Caller side (never blocks on the network) -----
+    def submit(self, run):
+        """Queue a run {"time", "date", "name"} for upload."""
+        run = dict(run)
+        run.setdefault("id", uuid.uuid4().hex)
+        with self._cond:
+            if not self._queue:
+                self._first_at = time.monotonic()
+            self._queue.append(run)
+            self._outbox_dirty = True
+            self._cond.notify()
+
+    def pending(self):
+        with self._cond:
+            return len(self._queue)
+
+    def top(self, mode="best", start=0, count=10):
+        """Future resolving to a Page. If the server can't be reached,
+        the last page fetched is returned with stale=True."""
+        fut = Future()
+        with self._cond:
+            if self._closed:
+                fut.set_exception(ConnectionError("leaderboard sync closed"))
+                return fut
+            self._fetches.append((fut, mode, start, count))
+            self._cond.notify()
+        return fut
+
+    def cached(self, mode="best", start=0, count=10):
+        """Last fetched Page for these arguments, or None."""
+        entry = self._pages.get((mode, start, count))
+        return entry[1] if entry else None
+
+    def flush(self, timeout=None):
+        """Send queued runs now, without waiting for `linger` (but still
+        respecting backoff); returns True once the queue is empty."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify()
+            try:
+                while self._queue and not self._closed:
+                    left = None if deadline is None else deadline - time.monotonic()
+                    if left is not None and left <= 0:
+                        break
+                    self._cond.wait(left)
+                return not self._queue
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout=2.0):
+        """Try to send what is queued for up to `timeout` seconds, then
+        stop. Anything left stays in the outbox for the next start."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if timeout is None or timeout > 0:
+            self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        # The worker may sit in a socket read for up to 2x self.timeout;
+        # don't wait for it. Save the queue (including runs submitted
+        # since the worker last saved) so the daemon thread can be
+        # abandoned; run ids make resending the in-flight batch harmless.
+        self._thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        if self._thread.is_alive():
+            self._save_outbox()
+
+    # ----- Worker -----
+    def _run(self):
+        self._load_outbox()
+        while True:
+            job = self._next_job()
+            if job is None:
+                break
+            try:
+                if job == "upload":
+                    self._upload()
+                else:
+                    self._fetch(*job)
+            except Exception as e:
+                # A bad response must not stop the worker
+                self.errors += 1
+                if job == "upload":
+                    with self._cond:
+                        self._retry_later()
+                elif not job[0].done():
+                    job[0].set_exception(e)
+        self._save_outbox()
+        if self._conn is not None:
+            self._conn.close()
+        with self._cond:
+            fetches, self._fetches = list(self._fetches), deque()
+        for fut, mode, start, count in fetches:
+            fut.set_exception(ConnectionError("leaderboard sync closed"))
+
+    def _next_job(self):
+        with self._cond:
+            while not self._closed:
+                if self._fetches:
+                    return self._fetches.popleft()
+                wait = None
+                if self._queue:
+                    now = time.monotonic()
+                    due = self._first_at + self.linger
+                    if self._flushing or len(self._queue) >= self.batch_size:
+                        due = now
+                    due = max(due, self._retry_at)
+                    if due <= now:
+                        return "upload"
+                    wait = due - now
+                self._cond.wait(wait)
+            return None
+
+    def _upload(self):
+        with self._cond:
+            batch = [self._queue[i] for i in range(min(self.batch_size, len(self._queue)))]
+        self._save_outbox()
+        try:
+            status, headers, _ = self._request("POST", "/runs", {"runs": batch})
+        except (OSError, http.client.HTTPException):
+            status, headers = None, {}
+        if status is not None and 200 <= status < 300:
+            self.sent += len(batch)
+            done = True
+        elif status is not None and 400 <= status < 500 and status not in (408, 429):
+            self.rejected += len(batch)
+            done = True
+        else:
+            done = False
+        with self._cond:
+            if done:
+                for _ in batch:
+                    self._queue.popleft()
+                self._first_at = time.monotonic() if self._queue else None
+                self._outbox_dirty = True
+                self._failures = 0
+                self._retry_at = 0.0
+            else:
+                self._retry_later(headers.get("Retry-After") if status is not None else None)
+            self._cond.notify_all()
+        if done:
+            self._save_outbox()
+
+    def _retry_later(self, retry_after=None):
+        """Back off before the next upload (call with _cond held)."""
+        self.retries += 1
+        self._failures += 1
+        delay = min(self.max_backoff, self.backoff * 2 ** (self._failures - 1))
+        delay *= random.uniform(0.5, 1.0)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        self._retry_at = time.monotonic() + delay
+
+    def _fetch(self, fut, mode, start, count):
+        key = (mode, start, count)
+        etag, page = self._pages.get(key, (None, None))
+        query = urlencode({"mode": mode, "start": start, "count": count})
+        try:
+            status, headers, data = self._request("GET", "/top?" + query,
+                                                  headers={"If-None-Match": etag} if etag else None)
+        except (OSError, http.client.HTTPException) as e:
+            if page is None:
+                fut.set_exception(e)
+            else:
+                fut.set_result(page._replace(stale=True))
+            return
+        if status == 304 and page is not None:
+            self.not_modified += 1
+            fut.set_result(page)
+        elif status == 200:
+            try:
+                body = json.loads(data)
+                fresh = Page(list(body["rows"]), int(body["total"]), False)
+            except (ValueError, KeyError, TypeError) as e:
+                self.errors += 1
+                if page is None:
+                    fut.set_exception(e)
+                else:
+                    fut.set_result(page._replace(stale=True))
+                return
+            self._pages[key] = (headers.get("ETag"), fresh)
+            fut.set_result(fresh)
+        elif page is not None:
+            fut.set_result(page._replace(stale=True))
+        else:
+            fut.set_exception(ConnectionError(f"leaderboard server answered {status}"))
+
+    def _request(self, method, path, body=None, headers=None):
+        """One request on the kept-alive connection; reconnects once if
+        the server dropped an idle connection."""
+        payload = None if body is None else json.dumps(body, separators=(",", ":")).encode("utf-8")
+        hdrs = {"Content-Type": "application/json"} if payload is not None else {}
+        hdrs.update(headers or {})
+        for attempt in (0, 1):
+            reused = self._conn is not None
+            if self._conn is None:
+                self._conn = self._conn_class(self._host, timeout=self.timeout)
+            try:
+                self.requests += 1
+                self._conn.request(method, self._base + path, payload, hdrs)
+                resp = self._conn.getresponse()
+                data = resp.read()
+            except (OSError, http.client.HTTPException):
+                self._conn.close()
+                self._conn = None
+                if reused and attempt == 0:
+                    continue
+                raise
+            if resp.will_close:
+                self._conn.close()
+                self._conn = None
+            return resp.status, resp.headers, data
+
+    # ----- Outbox file -----
+    def _load_outbox(self):
+        if self.outbox_path is None or not os.path.exists(self.outbox_path):
+            return
+        try:
+            with open(self.outbox_path, "r", encoding="utf-8") as f:
+                runs = json.load(f).get("runs", [])
+        except (OSError, ValueError, AttributeError):
+            return
+        with self._cond:
+            if runs:
+                # Saved runs are older than anything submitted since start
+                self._queue.extendleft(reversed(runs))
+                self._first_at = time.monotonic()
+                self._cond.notify_all()
+
+    def _save_outbox(self):
+        if self.outbox_path is None:
+            return
+        # Serialized: close() may save while the worker is still running
+        with self._outbox_lock:
+            with self._cond:
+                if not self._outbox_dirty:
+                    return
+                runs = list(self._queue)
+                self._outbox_dirty = False
+            try:
+                if runs:
+                    os.makedirs(os.path.dirname(self.outbox_path) or ".", exist_ok=True)
+                    glb.save_json(self.outbox_path, {"runs": runs}, indent=None)
+                elif os.path.exists(self.outbox_path):
+                    os.remove(self.outbox_path)
+            except OSError:
+                # e.g. disk full: keep syncing from memory, try again next time
+                self.errors += 1
+                with self._cond:
+                    self._outbox_dirty = True
+
+
+# -------------------- Stand-in server ------------------
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, like a real server
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body=None, headers=()):
+        data = b"" if body is None else json.dumps(body, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in headers:
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _injected_failure(self):
+        status = self.server.stand_in.take_failure()
+        if status is None:
+            return False
+        self._reply(status, {"error": "injected failure"}, [("Retry-After", "0")])
+        return True
+
+    def do_GET(self):
+        stand_in = self.server.stand_in
+        stand_in.count_request()
+        parts = urlsplit(self.path)
+        if parts.path != "/top":
+            return self._reply(404, {"error": "not found"})
+        if self._injected_failure():
+            return
+        q = parse_qs(parts.query)
+        try:
+            mode = q.get("mode", ["best"])[0]
+            start = max(0, int(q.get("start", ["0"])[0]))
+            count = min(100, max(0, int(q.get("count", ["10"])[0])))
+        except ValueError:
+            return self._reply(400, {"error": "bad query"})
+        etag, body = stand_in.page(mode, start, count)
+        if self.headers.get("If-None-Match") == etag:
+            return self._reply(304, headers=[("ETag", etag)])
+        self._reply(200, body, [("ETag", etag)])
+
+    def do_POST(self):
+        stand_in = self.server.stand_in
+        stand_in.count_request()
+        if urlsplit(self.path).path != "/runs":
+            return self._reply(404, {"error": "not found"})
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            self.close_connection = True
+            return self._reply(413, {"error": "body too large"})
+        raw = self.rfile.read(length)
+        if self._injected_failure():
+            return
+        try:
+            runs = json.loads(raw)["runs"]
+            runs = [{"id": str(r["id"]), "time": float(r["time"]),
+                     "date": str(r.get("date", "")), "name": str(r.get("name", "Player"))[:32]}
+                    for r in runs]
+        except (ValueError, KeyError, TypeError):
+            return self._reply(400, {"error": "bad runs"})
+        if len(runs) > MAX_BATCH:
+            return self._reply(413, {"error": f"at most {MAX_BATCH} runs per request"})
+        accepted = stand_in.add_runs(runs)
+        self._reply(200, {"accepted": accepted, "duplicates": len(runs) - accepted})
+
+
+class StandInServer:
+    """
+    In-memory leaderboard server with the online protocol, on a
+    background thread. port=0 picks a free port (see .url).
+    fail_next(n) makes the next n requests answer `status`, to
+    exercise the client's retry path.
+    """
+    def __init__(self, host="127.0.0.1", port=0):
+        self.board = glb.LeaderboardModel()
+        self._ids = set()
+        self._lock = threading.Lock()
+        self._version = 0
+        self._failures = deque()
+        self.requests = 0
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.stand_in = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="leaderboard-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def fail_next(self, n=1, status=503):
+        with self._lock:
+            self._failures.extend([status] * n)
+
+    # ----- Called from handler threads -----
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def take_failure(self):
+        with self._lock:
+            return self._failures.popleft() if self._failures else None
+
+    def add_runs(self, runs):
+        with self._lock:
+            accepted = 0
+            for run in runs:
+                if run["id"] in self._ids:
+                    continue
+                self._ids.add(run["id"])
+                self.board.add_run(run)
+                accepted += 1
+            if accepted:
+                self._version += 1
+            return accepted
+
+    def page(self, mode, start, count):
+        with self._lock:
+            rows = [{"time": r["time"], "date": r["date"], "name": r["name"]}
+                    for r in self.board.rows(mode, start, count)]
+            return f'"{self._version}"', {"rows": rows, "total": len(self.board)}
+
+
+# -------------------- Demo ----------------------------
+def main():
+    ap = argparse.ArgumentParser(description="Circle Eater online leaderboard stand-in")
+    ap.add_argument("--serve", action="store_true", help="run the stand-in server only")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=0)
+    ap.add_argument("--runs", type=int, default=1000, help="demo: runs to queue")
+    ap.add_argument("--fail", type=int, default=0, help="demo: requests the server fails first")
+    args = ap.parse_args()
+
+    server = StandInServer(args.host, args.port).start()
+    if args.serve:
+        print(f"leaderboard stand-in on {server.url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.stop()
+        return
+
+    server.fail_next(args.fail)
+    sync = LeaderboardSync(server.url, backoff=0.05)
+    t0 = time.perf_counter()
+    for i in range(args.runs):
+        sync.submit({"time": 3.0 + (i * 7919 % 1000) / 100, "date": f"2026-01-01 00:{i // 60 % 60:02d}:{i % 60:02d}",
+                     "name": f"bot{i % 10}"})
+    submit_ms = (time.perf_counter() - t0) * 1000
+    drained = sync.flush(timeout=30)
+    wall = time.perf_counter() - t0
+    first = sync.top("best", 0, 10).result()
+    again = sync.top("best", 0, 10).result()
+    sync.close()
+    server.stop()
+
+    print(f"queued {args.runs} runs in {submit_ms:.1f} ms; synced={drained} in {wall:.2f} s")
+    print(f"client: {sync.requests} requests ({sync.retries} retried), {sync.sent} runs sent, "
+          f"{sync.not_modified} top pages not modified")
+    print(f"server: {len(server.board)} runs stored, {server.requests} requests")
+    print(f"best: {first.rows[0]['time']:.2f} s by {first.rows[0]['name']} "
+          f"(second fetch {'reused' if again is first else 'refetched'} the cached page)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import gc
+import json
+import sys
+import time
+from collections import deque
+
+import pygame
+
+# Phases a frame is split into; "idle" is whatever follows the last mark
+# (normally the Clock.tick() sleep)
+PHASES = ("events", "physics", "collision", "draw", "flip", "idle")
+
+
+# -------------------- Counting font -------------------
+class CountingFont(pygame.font.Font):
+    """pygame Font that counts the text surfaces it creates (class-wide)."""
+    rendered = 0
+
+    def render(self, *args, **kwargs):
+        CountingFont.rendered += 1
+        return super().render(*args, **kwargs)
+
+
+def percentile(sorted_vals, q):
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, int(round(q * (len(sorted_vals) - 1))))
+    return sorted_vals[k]
+
+
+# -------------------- Frame monitor -------------------
+class PerfMonitor:
+    """
+    Per-frame timings and counters for the screen loops.
+    A loop calls mark(phase) after each part of its frame and end_frame()
+    once per iteration; the time since the previous mark is charged to
+    the phase. Counters are monotonic callables registered with watch();
+    each frame records how much they grew. The last `history` frames feed
+    stats() and the overlay; info() adds static text (e.g. asset load
+    stats) below them. While disabled every call returns at once.
+    """
+    def __init__(self, history=240):
+        self.enabled = False
+        self.frames = deque(maxlen=history)
+        self.screen = None
+        self._watched = {
+            "py_blocks": sys.getallocatedblocks,
+            "gc": lambda: gc.get_stats()[0]["collections"],
+        }
+        self._info = {}
+        self._base = {}
+        self._phases = {}
+        self._start = 0.0
+        self._last = 0.0
+        self._trace = None
+        self._trace_origin = 0.0
+        self._overlay = None
+        self._overlay_time = 0.0
+        self._font = None
+
+    # ---- Control ----
+    def watch(self, name, counter):
+        """Report the per-frame growth of counter() as `name`."""
+        self._watched[name] = counter
+        if self.enabled:
+            self._base[name] = counter()
+
+    def info(self, name, lines):
+        """Also list the text lines from lines() under `name` in the overlay."""
+        self._info[name] = lines
+
+    def enable(self):
+        self.enabled = True
+        self.frames.clear()
+        self._base = {name: fn() for name, fn in self._watched.items()}
+        self._phases = {}
+        self._start = self._last = time.perf_counter()
+        self._overlay = None
+
+    def disable(self):
+        self.enabled = False
+        self.stop_trace()
+
+    def toggle(self):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+        return self.enabled
+
+    def handle_event(self, event):
+        """F3 toggles the overlay, Shift+F3 starts/stops a trace file.
+        Returns True if the event was consumed."""
+        if event.type != pygame.KEYDOWN or event.key != pygame.K_F3:
+            return False
+        if event.mod & pygame.KMOD_SHIFT:
+            if self._trace is None:
+                if not self.enabled:
+                    self.enable()
+                self.start_trace("perf_trace.json")
+            else:
+                self.stop_trace()
+        else:
+            self.toggle()
+        return True
+
+    # ---- Per frame ----
+    def mark(self, phase):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._phases[phase] = self._phases.get(phase, 0.0) + (now - self._last)
+        self._last = now
+
+    def end_frame(self, screen):
+        if not self.enabled:
+            return
+        self.mark("idle")
+        now = self._last
+        counts = {}
+        for name, fn in self._watched.items():
+            value = fn()
+            counts[name] = value - self._base.get(name, value)
+            self._base[name] = value
+        frame = (screen, now - self._start, self._phases, counts)
+        if screen != self.screen:
+            # New screen: the first frame straddles the switch, skip it
+            self.frames.clear()
+            self.screen = screen
+        else:
+            self.frames.append(frame)
+        if self._trace is not None:
+            self._write_trace(self._start, frame)
+        self._phases = {}
+        self._start = now
+
+    # ---- Metrics API ----
+    def stats(self):
+        """Summary of the recorded frames (times in ms, counters per frame)."""
+        frames = self.frames
+        n = len(frames)
+        if n == 0:
+            return None
+        totals = sorted(f[1] for f in frames)
+        total = sum(totals)
+        phases = {}
+        counts = {}
+        for _, _, ph, ct in frames:
+            for k, v in ph.items():
+                phases[k] = phases.get(k, 0.0) + v
+            for k, v in ct.items():
+                counts[k] = counts.get(k, 0) + v
+        return {
+            "screen": self.screen,
+            "frames": n,
+            "fps": n / total if total > 0 else 0.0,
+            "frame_ms": {
+                "mean": total / n * 1000,
+                "p50": percentile(totals, 0.50) * 1000,
+                "p95": percentile(totals, 0.95) * 1000,
+                "p99": percentile(totals, 0.99) * 1000,
+                "max": totals[-1] * 1000,
+            },
+            "phase_ms": {k: v / n * 1000 for k, v in phases.items()},
+            "per_frame": {k: v / n for k, v in counts.items()},
+        }
+
+    # ---- Trace file ----
+    def start_trace(self, path):
+        """Stream every frame to `path` in Chrome trace-event format
+        (load it in chrome://tracing or ui.perfetto.dev)."""
+        self.stop_trace()
+        self._trace = open(path, "w", encoding="utf-8")
+        self._trace.write("[\n")
+        self._trace_origin = self._start if self.enabled else time.perf_counter()
+
+    def stop_trace(self):
+        if self._trace is None:
+            return
+        self._trace.write(json.dumps({"name": "trace end", "ph": "i", "s": "g", "pid": 1, "tid": 1,
+                                      "ts": (time.perf_counter() - self._trace_origin) * 1e6}) + "]\n")
+        self._trace.close()
+        self._trace = None
+
+    def _write_trace(self, start, frame):
+        screen, total, phases, counts = frame
+        ts = (start - self._trace_origin) * 1e6
+        events = [{"name": screen, "ph": "X", "pid": 1, "tid": 1, "ts": ts, "dur": total * 1e6}]
+        t = ts
+        for name in PHASES:
+            dur = phases.get(name)
+            if dur:
+                events.append({"name": name, "ph": "X", "pid": 1, "tid": 2, "ts": t, "dur": dur * 1e6})
+                t += dur * 1e6
+        events.append({"name": "counters", "ph": "C", "pid": 1, "ts": ts, "args": counts})
+        self._trace.write("".join(json.dumps(e) + ",\n" for e in events))
+
+    # ---- Overlay ----
+    def draw(self, surface, refresh=0.25):
+        """Draw the overlay in the top-right corner; returns its rect
+        (None while disabled). Text is re-rendered every `refresh` s."""
+        if not self.enabled:
+            return None
+        now = time.perf_counter()
+        if self._overlay is None or now - self._overlay_time >= refresh:
+            self._overlay = self._render_overlay()
+            self._overlay_time = now
+        if self._overlay is None:
+            return None
+        return surface.blit(self._overlay, (surface.get_width() - self._overlay.get_width() - 8, 8))
+
+    def _render_overlay(self):
+        s = self.stats()
+        if s is None:
+            return None
+        if self._font is None:
+            # Plain Font, so the overlay's own text isn't counted
+            self._font = pygame.font.Font(None, 20)
+        fm, ph, pf = s["frame_ms"], s["phase_ms"], s["per_frame"]
+        lines = [
+            f"{s['screen']}  {s['fps']:.0f} fps" + ("  [trace]" if self._trace is not None else ""),
+            f"frame ms  p50 {fm['p50']:.1f}  p95 {fm['p95']:.1f}  p99 {fm['p99']:.1f}",
+        ]
+        lines += [f"  {name:<9} {ph[name]:6.2f} ms" for name in PHASES if name in ph]
+        lines += [f"  {name:<9} {pf[name]:8.1f} /frame" for name in sorted(pf)]
+        for name, fn in self._info.items():
+            lines.append(name)
+            lines += ["  " + line for line in fn()]
+
+        rendered = [self._font.render(line, True, (255, 255, 255)) for line in lines]
+        width = max(r.get_width() for r in rendered) + 12
+        height = sum(r.get_height() for r in rendered) + 10
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        y = 5
+        for r in rendered:
+            panel.blit(r, (6, y))
+            y += r.get_height()
+        return panel
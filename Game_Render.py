@@ -0,0 +1,375 @@
+from collections import OrderedDict
+
+import pygame
+import pygame.gfxdraw
+
+
+# -------------------- Text cache ----------------------
+class TextCache:
+    """
+    LRU cache of rendered text surfaces keyed by (font, text, color,
+    antialias). Memory is bounded by the summed pixel bytes of the cached
+    surfaces; the least recently used entries are dropped first.
+    """
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surf = self._entries.get(key)
+        if surf is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        surf = font.render(text, antialias, color)
+        self._entries[key] = surf
+        self.bytes += _surface_bytes(surf)
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            self.bytes -= _surface_bytes(old)
+        return surf
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _surface_bytes(surf):
+    return surf.get_width() * surf.get_height() * surf.get_bytesize()
+
+
+# -------------------- Glyph atlas ---------------------
+class GlyphAtlas:
+    """
+    Pre-rendered glyphs for one font/color, used to compose fast-changing
+    strings such as the HUD timer without rasterizing text each frame.
+    Characters outside the atlas are rendered once and added on demand.
+    """
+    def __init__(self, font, color, chars="0123456789.:- ", antialias=True):
+        self.font = font
+        self.color = color
+        self.antialias = antialias
+        self.height = font.get_height()
+        self.glyphs = {}
+        for ch in chars:
+            self._glyph(ch)
+
+    def _glyph(self, ch):
+        g = self.glyphs.get(ch)
+        if g is None:
+            g = self.font.render(ch, self.antialias, self.color)
+            self.glyphs[ch] = g
+        return g
+
+    def size(self, text):
+        return sum(self._glyph(ch).get_width() for ch in text), self.height
+
+    def blit(self, surface, text, pos):
+        """Draw text with its top-left at pos; returns the covered Rect."""
+        x, y = pos
+        seq = []
+        for ch in text:
+            g = self._glyph(ch)
+            seq.append((g, (x, y)))
+            x += g.get_width()
+        surface.blits(seq, False)
+        return pygame.Rect(pos[0], y, x - pos[0], self.height)
+
+
+# -------------------- Circle sprites ------------------
+class CircleSprites:
+    """
+    Pre-rasterized circle surfaces keyed by (radius, color).
+    Drawing a circle becomes a blit, and a whole frame of circles one
+    Surface.blits() call. Plain sprites use an RLE colorkey; antialiased
+    ones use per-pixel alpha. Surfaces are converted to the display
+    format when a display exists. The cache is emptied if it grows past
+    max_entries (cheaper per lookup than LRU bookkeeping).
+    """
+    def __init__(self, antialias=False, max_entries=4096):
+        self.antialias = antialias
+        self.max_entries = max_entries
+        self.rasterized = 0
+        self._sprites = {}
+
+    def get(self, radius, color):
+        r = int(radius)
+        key = (r, color)
+        surf = self._sprites.get(key)
+        if surf is None:
+            if len(self._sprites) >= self.max_entries:
+                self._sprites.clear()
+            surf = self._sprites[key] = self._rasterize(r, color)
+            self.rasterized += 1
+        return surf
+
+    def _rasterize(self, r, color):
+        size = (2 * r, 2 * r)
+        has_display = pygame.display.get_surface() is not None
+        if self.antialias:
+            surf = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.gfxdraw.filled_circle(surf, r, r, r - 1, color)
+            pygame.gfxdraw.aacircle(surf, r, r, r - 1, color)
+            return surf.convert_alpha() if has_display else surf
+        key = (255, 0, 255) if tuple(color[:3]) != (255, 0, 255) else (0, 255, 0)
+        surf = pygame.Surface(size)
+        surf.fill(key)
+        pygame.draw.circle(surf, color, (r, r), r)
+        if has_display:
+            surf = surf.convert()
+        surf.set_colorkey(key, pygame.RLEACCEL)
+        return surf
+
+    def blit(self, surface, x, y, radius, color):
+        r = int(radius)
+        return surface.blit(self.get(r, color), (round(x) - r, round(y) - r))
+
+    def draw_all(self, surface, items, doreturn=True):
+        """Blit every (x, y, r, color) in one batch; returns the rects."""
+        sprites = self._sprites
+        seq = []
+        append = seq.append
+        for x, y, r, color in items:
+            r = int(r)
+            surf = sprites.get((r, color))
+            if surf is None:
+                surf = self.get(r, color)
+            append((surf, (int(x + 0.5) - r, int(y + 0.5) - r)))
+        return surface.blits(seq, doreturn)
+
+    def __len__(self):
+        return len(self._sprites)
+
+
+# -------------------- Blurred overlays ----------------
+class OverlayBlur:
+    """
+    Blur + dim backdrop for dialogs and the win screen.
+    The full-screen buffers (snapshot, output, dim layer) are allocated
+    once per screen size and the downscaled copy once per blur factor,
+    so reopening any overlay (dialogs and the win screen use different
+    factors) allocates nothing. With progressive=True the work is spread
+    over the next frames: each step() runs one stage (downscale, upscale,
+    dim) and returns the best backdrop so far.
+    """
+    def __init__(self, shadow=(0, 0, 0, 140)):
+        self.shadow = shadow
+        self.size = None
+        self.factor = None
+        self.snapshot = None
+        self.small = None
+        self._smalls = {}   # blur factor -> downscale buffer
+        self.out = None
+        self.dim = None
+        self._stages = []
+        self.allocations = 0
+
+    def _ensure_buffers(self, src, factor):
+        size = src.get_size()
+        if size != self.size:
+            self.size = size
+            self.snapshot = src.copy()
+            self.out = src.copy()
+            self.dim = pygame.Surface(size, pygame.SRCALPHA)
+            self.dim.fill(self.shadow)
+            self.factor = None
+            self._smalls = {}
+            self.allocations += 3
+        if factor != self.factor:
+            self.factor = factor
+            self.small = self._smalls.get(factor)
+            if self.small is None:
+                small_size = (max(1, size[0] // factor), max(1, size[1] // factor))
+                self.small = self._smalls[factor] = pygame.Surface(small_size, 0, self.snapshot)
+                self.allocations += 1
+
+    def begin(self, src, factor=8, dim=True, progressive=True):
+        """Capture src and queue the blur; run it all now unless progressive."""
+        factor = max(1, int(factor))
+        self._ensure_buffers(src, factor)
+        self.snapshot.blit(src, (0, 0))
+        if factor < 2:
+            self._stages = [lambda: self.out.blit(self.snapshot, (0, 0))]
+        else:
+            self._stages = [
+                lambda: pygame.transform.smoothscale(self.snapshot, self.small.get_size(), self.small),
+                lambda: pygame.transform.smoothscale(self.small, self.size, self.out),
+            ]
+        if dim:
+            self._stages.append(lambda: self.out.blit(self.dim, (0, 0)))
+        if not progressive:
+            while self._stages:
+                self._stages.pop(0)()
+
+    @property
+    def done(self):
+        return not self._stages
+
+    def step(self):
+        """Run one pending stage; returns the finished backdrop, or the
+        plain snapshot while stages are still pending."""
+        if self._stages:
+            self._stages.pop(0)()
+        return self.out if not self._stages else self.snapshot
+
+    def blur(self, src, factor=8, dim=True):
+        """Blur src right away; returns the shared output buffer."""
+        self.begin(src, factor, dim, progressive=False)
+        return self.out
+
+
+# -------------------- Dirty rectangles ----------------
+class DirtyRenderer:
+    """
+    Clears and presents only the parts of the screen that changed.
+    Each frame: begin() erases last frame's rects, the caller draws and
+    add()s the rects it touched, and present() pushes old + new rects
+    with pygame.display.update(). When the dirty area (or rect count)
+    gets large a plain flip() is cheaper and is used instead.
+    """
+    def __init__(self, full_ratio=0.35, max_rects=256):
+        self.full_ratio = full_ratio
+        self.max_rects = max_rects
+        self.prev = []
+        self.cur = []
+        self.full = True   # first frame always redraws everything
+        self.full_frames = 0
+        self.partial_frames = 0
+
+    def invalidate(self):
+        """Force a full redraw next frame (e.g. after an overlay)."""
+        self.full = True
+
+    def begin(self, surface, bg):
+        if self.full:
+            surface.fill(bg)
+        else:
+            for r in self.prev:
+                surface.fill(bg, r)
+        self.cur = []
+
+    def add(self, rect):
+        self.cur.append(rect)
+        return rect
+
+    def add_all(self, rects):
+        self.cur.extend(rects)
+
+    def present(self, surface):
+        dirty = self.prev + self.cur
+        area = sum(r.w * r.h for r in dirty)
+        limit = self.full_ratio * surface.get_width() * surface.get_height()
+        if self.full or area > limit or len(dirty) > self.max_rects:
+            pygame.display.flip()
+            self.full_frames += 1
+        else:
+            pygame.display.update(dirty)
+            self.partial_frames += 1
+        self.full = False
+        self.prev = self.cur
+
+
+# -------------------- Idle redraw ---------------------
+class RedrawScheduler:
+    """
+    Drives screens that are static while idle (menus, settings,
+    leaderboard). wait() blocks in pygame.event.wait() until input
+    arrives, an animation frame is due or the heartbeat passes, so an
+    idle screen costs next to no CPU. A frame is due only after an
+    event other than plain mouse motion, a change of the value given to
+    track() (e.g. which button is hovered), invalidate() or animate().
+    """
+    def __init__(self, heartbeat_ms=1000):
+        self.heartbeat_ms = heartbeat_ms
+        self.dirty = True   # the first frame always draws
+        self.frames = 0
+        self.sleeps = 0
+        self._state = None
+        self._deadline = None   # get_ticks() of the next animation frame
+
+    def invalidate(self):
+        self.dirty = True
+
+    def animate(self, delay_ms=0):
+        """Ask for a frame in delay_ms, even without input."""
+        t = pygame.time.get_ticks() + delay_ms
+        if self._deadline is None or t < self._deadline:
+            self._deadline = t
+
+    def track(self, state):
+        """Redraw when `state` differs from the last call's."""
+        if state != self._state:
+            self._state = state
+            self.dirty = True
+
+    def wait(self):
+        """Return pending events, blocking while nothing needs a redraw."""
+        events = pygame.event.get()
+        if not events and not self.dirty:
+            timeout = self.heartbeat_ms
+            if self._deadline is not None:
+                timeout = min(timeout, self._deadline - pygame.time.get_ticks())
+            if timeout > 0:   # wait(0) would block with no limit
+                self.sleeps += 1
+                event = pygame.event.wait(timeout)
+                if event.type != pygame.NOEVENT:
+                    events = [event] + pygame.event.get()
+        if self._deadline is not None and pygame.time.get_ticks() >= self._deadline:
+            self._deadline = None
+            self.dirty = True
+        for event in events:
+            if event.type != pygame.MOUSEMOTION:
+                self.dirty = True
+                break
+        return events
+
+    def drawn(self):
+        """Call after presenting a frame."""
+        self.dirty = False
+        self.frames += 1
+
+
+# -------------------- Scenes --------------------------
+class Scene:
+    """
+    A screen split into a static layer, composited once onto its own
+    surface, and a small dynamic layer drawn over it every frame.
+    draw_static(surface) paints everything that only depends on
+    static_key() (settings, layout); the layer is rebuilt when that key
+    or the display size changes, or after invalidate(). Each frame is
+    then one full-screen blit plus draw_dynamic(surface).
+    """
+    def __init__(self, bg, draw_static, draw_dynamic=None, static_key=None):
+        self.bg = bg
+        self.draw_static = draw_static
+        self.draw_dynamic = draw_dynamic
+        self.static_key = static_key
+        self.rebuilds = 0
+        self._layer = None
+        self._key = None
+
+    def invalidate(self):
+        self._key = None
+
+    def draw(self, surface):
+        size = surface.get_size()
+        key = (size, self.static_key() if self.static_key is not None else None)
+        if key != self._key:
+            if self._layer is None or self._layer.get_size() != size:
+                self._layer = pygame.Surface(size, 0, surface)
+            self._layer.fill(self.bg)
+            self.draw_static(self._layer)
+            self._key = key
+            self.rebuilds += 1
+        surface.blit(self._layer, (0, 0))
+        if self.draw_dynamic is not None:
+            self.draw_dynamic(surface)
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# -------------------- Load / Save ---------------------
+def load_settings(path, defaults):
+    data = defaults.copy()
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            for k, v in defaults.items():
+                data[k] = raw.get(k, v)
+        except Exception:
+            pass
+    return data
+
+
+def save_settings(path, data):
+    # Temp file + rename so a crash mid-write never leaves a broken file
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+# -------------------- Debounced writer ----------------
+class DebouncedWriter:
+    """
+    Coalesces settings saves onto a background thread.
+    submit() only snapshots the data; the file is written once no new
+    submit() has arrived for `delay` seconds. A slider drag therefore
+    costs one write instead of one per mouse event. flush() writes any
+    pending snapshot immediately (call it before exiting). A failed
+    write is logged and the snapshot is kept and retried, backing off
+    up to `max_retry_delay` seconds, unless a newer one replaces it.
+    """
+    def __init__(self, path, delay=0.5, max_retry_delay=30.0):
+        self.path = path
+        self.delay = delay
+        self.max_retry_delay = max_retry_delay
+        self._cond = threading.Condition()
+        self._pending = None
+        self._inflight = False   # a snapshot is being written (worker or flush)
+        self._due = 0.0
+        self._closed = False
+        self._thread = None
+        self.writes = 0
+        self.failures = 0   # failed writes in a row
+
+    def submit(self, data):
+        with self._cond:
+            self._pending = dict(data)
+            self._due = time.monotonic() + self.delay
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="settings-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _take(self, wait_until_due):
+        """Claim the pending snapshot (None if there is none). Only one
+        snapshot is written at a time, so the newest always lands last."""
+        with self._cond:
+            while not self._closed:
+                if self._inflight or (wait_until_due and self._pending is None):
+                    self._cond.wait()
+                    continue
+                if wait_until_due:
+                    left = self._due - time.monotonic()
+                    if left > 0:
+                        self._cond.wait(left)
+                        continue
+                data, self._pending = self._pending, None
+                self._inflight = data is not None
+                return data
+            return None
+
+    def _run(self):
+        while True:
+            data = self._take(wait_until_due=True)
+            if data is None:
+                return
+            self._write(data)
+
+    def _write(self, data):
+        """Write one claimed snapshot; never raises, so neither the worker
+        nor close() can be taken down by a full or read-only disk."""
+        try:
+            save_settings(self.path, data)
+        except OSError as e:
+            log.warning("could not save settings to %s: %s", self.path, e)
+            with self._cond:
+                self.failures += 1
+                if self._pending is None:
+                    self._pending = data
+                    delay = min(self.max_retry_delay, self.delay * 2 ** self.failures)
+                    self._due = time.monotonic() + delay
+                self._inflight = False
+                self._cond.notify_all()
+            return False
+        with self._cond:
+            self.writes += 1
+            self.failures = 0
+            self._inflight = False
+            self._cond.notify_all()
+        return True
+
+    def flush(self):
+        """Write any pending snapshot now; returns once it (and any write
+        already in flight) has been attempted. False if the write failed."""
+        data = self._take(wait_until_due=False)
+        if data is None:
+            return True
+        return self._write(data)
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()